@@ -1,14 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlmodel import Session
 from typing import List
-from app.core.db import get_session
+from app.core.db import get_read_session, get_session
 from app.models.accounts import Account
-from app.models.users import User
-from app.schemas.accounts import AccountCreate, AccountRead, AccountUpdate
-from app.schemas.users import UserCreate, UserReadBasic
+from app.schemas.accounts import AccountCreate, AccountRead, AccountUpdate, account_list_adapter
+from app.schemas.users import UserCreate
 from app.utils import accounts as account_utils
 from app.utils import users as user_utils
-from app.utils.auth import get_current_user
+from app.utils.auth import Principal, get_current_principal, get_current_user, require_account_member
+from app.utils.responses import etag_for, etag_matches, json_list_response, not_modified
 from app.core.security import hash_password
 
 router = APIRouter()
@@ -16,15 +16,27 @@ router = APIRouter()
 # --- GET all accounts for the current user ---
 @router.get("/", response_model=List[AccountRead])
 async def list_accounts(
-    current_user: User = Depends(get_current_user), 
-    session: Session = Depends(get_session)
+    request: Request,
+    current_user: Principal = Depends(get_current_principal),
+    session: Session = Depends(get_read_session)
 ):
     """
     Retrieve all accounts for the currently logged-in user.
+    Conditional requests are answered from the accounts' versions alone.
     """
-    # assuming a many-to-many relationship: user.accounts
-    accounts = current_user.accounts  # this will already be a list of Account objects
-    return accounts
+    if request.headers.get("if-none-match"):
+        versions = await account_utils.get_accounts_for_user(
+            user_id=current_user.user_id,
+            session=session,
+            columns=(Account.id, Account.version)
+        )
+        etag = etag_for(versions)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    accounts = await account_utils.get_accounts_for_user(user_id=current_user.user_id, session=session)
+    etag = etag_for((account.id, account.version) for account in accounts)
+    return json_list_response(account_list_adapter, accounts, headers={"ETag": etag})
 
 
 # --- POST create a new account ---
@@ -34,28 +46,38 @@ async def create_account(
     user: UserCreate,
     session: Session = Depends(get_session)):
     """
-    Create a new account in the database."""
+    Create a new account, and its first user, in one transaction."""
+    existing_user = await user_utils.get_user_by_email(email=user.email, session=session)
+    password_hash = None
+    if not existing_user:
+        # End the lookup's transaction and hash before writing anything: a
+        # transaction held open through bcrypt pins a pooled connection, and
+        # on SQLite a write transaction blocks every other writer
+        await session.commit()
+        password_hash = await hash_password(user.password)
+
     account = await account_utils.create_new_account_in_db(
         account_organisation=account.account_organisation,
         session=session
     )
-
-    existing_user = await user_utils.get_user_by_email(email=user.email, session=session)
     if existing_user:
         await user_utils.add_user_to_accounts(
             user=existing_user,
             account_ids=[account.id],
             session=session
         )
+        await session.commit()
         return account
 
     user = await user_utils.create_new_user_in_db(
         email=user.email,
-        password=hash_password(user.password),
+        password=password_hash,
         full_name=user.full_name,
-        account_ids=[account.id],
+        account_ids=None,
+        accounts=[account],
         session=session
     )
+    await session.commit()
 
     return account
 
@@ -65,7 +87,7 @@ async def create_account(
 async def update_account(
     account_unique_id: str,
     account_update: AccountUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
     """
@@ -82,7 +104,8 @@ async def update_account(
         account_organisation=account_update.account_organisation or account.account_organisation,
         session=session
     )
-    
+    await session.commit()
+
     return account
 
 
@@ -90,16 +113,31 @@ async def update_account(
 @router.get("/{account_unique_id}", response_model=AccountRead)
 async def get_account(
     account_unique_id: str,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)):
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    session: Session = Depends(get_read_session)):
     """
-    Retrieve a single account by its account_unique_id."""
-    account = await account_utils.get_account_by_account_unique_id(
+    Retrieve a single account by its account_unique_id.
+    Conditional requests are answered from the account's version alone."""
+    require_account_member(current_user, account_unique_id)
+    version = None
+    if request.headers.get("if-none-match"):
+        version = await account_utils.get_account_version(account_unique_id, session)
+        if version is None:
+            raise HTTPException(status_code=404, detail="Account not found")
+        etag = etag_for([(account_unique_id, version)])
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    account = await account_utils.get_cached_account(
         account_unique_id=account_unique_id,
-        session=session
+        session=session,
+        version=version
     )
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
+    response.headers["ETag"] = etag_for([(account_unique_id, account.version)])
     return account
 
 
@@ -107,28 +145,24 @@ async def get_account(
 @router.delete("/{account_unique_id}", response_model=dict)
 async def delete_account(
     account_unique_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
     """
     Delete an account and any users that are only associated with this account."""
+    # From the primary, not the account cache: a cached entry can outlive
+    # the account's deletion on another worker
     account = await account_utils.get_account_by_account_unique_id(
         account_unique_id=account_unique_id,
         session=session
     )
-    if not account:
+    if account is None:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    # Find users associated only with this account
-    users_to_delete = await user_utils.get_orphaned_users_to_delete(account=account, session=session)
-    
-    # Delete the account
-    await session.delete(account)
-    
-    # Delete orphaned users
-    for user in users_to_delete:
-        await user_utils.delete_user_in_db(user=user, session=session)
-    
+    deleted = await account_utils.delete_account_and_orphaned_users(
+        account_id=account.id,
+        session=session
+    )
     await session.commit()
-    
-    return {"detail": "Account and associated orphaned users deleted successfully"}
+
+    return {"detail": "Account and associated orphaned users deleted successfully", **deleted}
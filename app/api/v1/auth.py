@@ -2,21 +2,23 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlmodel import Session, select
 from sqlalchemy.orm import selectinload
-from jose import jwt, JWTError
-from app.schemas.token import Token
+from datetime import datetime
+from app.schemas.token import LogoutRequest, RefreshRequest, Token
 from app.schemas.users import UserLogin
 from app.schemas.security import ForgotPasswordRequest, TokenValidateRequest, ResetPasswordRequest
 from app.models.users import User
 from app.core.db import get_session
 import app.core.security as security
-from app.core.aws_ses_service import EmailService, get_email_service
+from app.core import email_outbox
 from app.core.config import settings
+from app.core.revocation import revocation_store
+from app.core.tokens import TokenError, decode_token
+from app.utils.auth import oauth2_scheme
 from app.utils import users as user_utils
-import boto3
+import logging
 
 router = APIRouter(tags=["auth"])
-# Initialize the S3 client
-s3 = boto3.client('s3')
+logger = logging.getLogger(__name__)
 
 
 @router.post("/login", response_model=Token)
@@ -35,7 +37,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Sessi
     if not db_user or not await security.verify_password(form_data.password, db_user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    access_token = await security.create_access_token(data={"sub": db_user.email})
+    access_token = await _issue_access_token(db_user)
+    refresh_token = await security.create_refresh_token(db_user.id, session=session)
     accounts = db_user.accounts
     if len(accounts) == 1:
         account_unique_id = accounts[0].account_unique_id
@@ -44,32 +47,88 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Sessi
         account_unique_id = None
         account_organisation = None
 
-    return {"access_token": access_token, "account_unique_id": account_unique_id, "account_organisation": account_organisation , "token_type": "bearer"}
+    return {"access_token": access_token, "refresh_token": refresh_token, "account_unique_id": account_unique_id, "account_organisation": account_organisation , "token_type": "bearer"}
+
+
+async def _issue_access_token(user: User) -> str:
+    if settings.ACCESS_TOKEN_FORMAT == "scoped":
+        return await security.create_scoped_access_token(user)
+    return await security.create_access_token(data={"sub": user.email})
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshRequest, session: Session = Depends(get_session)):
+    """
+    Exchange a refresh token for a new access token and a rotated refresh
+    token, without verifying the password again.
+    """
+    rotated = await security.rotate_refresh_token(request.refresh_token, session=session)
+    if rotated is None:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    user_id, refresh_token = rotated
+
+    user = await user_utils.get_user_with_accounts_by_id(user_id, session)
+    if user is None:
+        raise HTTPException(status_code=401, detail="Invalid refresh token")
+    access_token = await _issue_access_token(user)
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+@router.post("/logout", status_code=status.HTTP_200_OK)
+async def logout(
+    request: LogoutRequest,
+    token: str = Depends(oauth2_scheme),
+    session: Session = Depends(get_session)):
+    """
+    Revoke the presented access token and, if given, its refresh token family.
+    """
+    try:
+        payload = decode_token(token)
+    except TokenError:
+        raise HTTPException(status_code=401, detail="Could not validate credentials")
+    if payload.get("jti"):
+        await revocation_store.revoke(payload["jti"], datetime.fromtimestamp(payload["exp"]))
+
+    if request.refresh_token:
+        record = await security.get_refresh_token(request.refresh_token, session=session)
+        if record is not None and record.user_id == await _caller_user_id(payload, session):
+            await security.revoke_refresh_token_family(record.family_id, session=session)
+
+    return {"message": "Logged out."}
+
+
+async def _caller_user_id(payload: dict, session: Session) -> int | None:
+    # Scoped tokens carry the id; legacy tokens only the email
+    if "uid" in payload:
+        return payload["uid"]
+    result = await session.exec(select(User.id).where(User.email == payload.get("sub")))
+    return result.first()
 
 
 @router.post("/forgot-password", status_code=status.HTTP_200_OK)
 async def forgot_password(
     request: ForgotPasswordRequest,
-    email_service: EmailService = Depends(get_email_service),
     session: Session = Depends(get_session)):
     """
     Handle forgot password requests.
     """
-    user = await user_utils.get_user_by_email(email=request.email, session=session)
+    user = await user_utils.get_user_credentials_by_email(email=request.email, session=session)
     if user:
-        token = await security.create_password_reset_token(user.id, session=session)
+        if settings.PASSWORD_RESET_TOKEN_MODE == "signed":
+            token = security.create_signed_reset_token(user.id, user.password)
+        else:
+            token = await security.create_password_reset_token(user.id, session=session)
 
         reset_link = f"{settings.FE_BASE_URL}/reset-password?token={token}"
-        print(f"Password reset link for {user.email}: {reset_link}")
-
-        try:
-            await email_service.send_password_reset_email(
-                to_email=user.email,
-                reset_link=reset_link
-            )
-        except Exception as e:
-            print(f"ERROR: Could not send password reset email to {user.email}. Error: {e}")
-            return {"message": "If an account with that email exists, a password reset link has been sent."}
+        logger.debug("Password reset link for %s: %s", user.email, reset_link)
+
+        # Commits the token and the queued email together; delivery happens
+        # in the background dispatcher
+        await email_outbox.enqueue_password_reset_email(
+            to_email=user.email,
+            reset_link=reset_link,
+            session=session
+        )
 
     return {"message": "If an account with that email exists, a password reset link has been sent."}
 
@@ -81,6 +140,15 @@ async def validate_reset_token(
     ):
     """
     Serves the Password Reset Step 2"""
+    if settings.PASSWORD_RESET_TOKEN_MODE == "signed":
+        # Signature and expiry only, no query
+        if security.read_signed_reset_token(request_data.token) is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Token is invalid or has expired.",
+            )
+        return {"message": "Token is valid."}
+
     token_record = await security.get_reset_token(token=request_data.token, session=session)
     if not token_record or token_record.is_expired():
         raise HTTPException(
@@ -95,6 +163,23 @@ async def reset_password(
     request: ResetPasswordRequest,
     session: Session = Depends(get_session),
     ):
+    if settings.PASSWORD_RESET_TOKEN_MODE == "signed":
+        # Changing the password invalidates the token's fingerprint, so it
+        # cannot be reused; the update only applies while the hash it was
+        # checked against is still current
+        target = await security.get_signed_reset_token_user(request.token, session=session)
+        if target is None or not await security.update_user_password(
+            user_id=target[0],
+            password=request.new_password,
+            session=session,
+            current_password_hash=target[1],
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Token is invalid or has expired.",
+            )
+        return {"message": "Password has been successfully reset."}
+
     token_record = await security.get_reset_token(token=request.token, session=session)
 
     # 1. Re-validate the token
@@ -1,8 +1,50 @@
 from fastapi import APIRouter
+from app.core.admission import AdmissionGroup
+from app.core.config import settings
+from app.core.rate_limit import RateLimitRule
 from . import accounts, users
 from . import auth
 
 router = APIRouter()
 router.include_router(accounts.router, prefix="/accounts", tags=["accounts"])
 router.include_router(users.router, prefix="/users", tags=["users"])
-router.include_router(auth.router, prefix="/auth", tags=["auth"])
\ No newline at end of file
+router.include_router(auth.router, prefix="/auth", tags=["auth"])
+
+# Concurrency limits applied by AdmissionMiddleware: auth is bound by the
+# password hasher, reads and writes by the connection pools
+admission_groups = {
+    name: AdmissionGroup(
+        name,
+        min_limit=settings.ADMISSION_MIN_CONCURRENCY,
+        max_limit=max_limit,
+        target_latency_ms=target_latency_ms,
+        queue_size=settings.ADMISSION_QUEUE_SIZE,
+        queue_timeout_seconds=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+    )
+    for name, max_limit, target_latency_ms in (
+        ("auth", settings.ADMISSION_AUTH_MAX_CONCURRENCY, settings.ADMISSION_AUTH_TARGET_LATENCY_MS),
+        ("reads", settings.ADMISSION_READ_MAX_CONCURRENCY, settings.ADMISSION_READ_TARGET_LATENCY_MS),
+        ("writes", settings.ADMISSION_WRITE_MAX_CONCURRENCY, settings.ADMISSION_WRITE_TARGET_LATENCY_MS),
+    )
+}
+
+# Long-running by design; they hold a slot but do not feed the latency samples
+admission_unsampled_paths = ("/users/bulk/",)
+
+# Enforced by RateLimitMiddleware before the request reaches the route
+rate_limit_rules = [
+    RateLimitRule("POST", "/auth/login",
+                  limit=settings.LOGIN_RATE_LIMIT_PER_IP,
+                  window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS),
+    RateLimitRule("POST", "/auth/login",
+                  limit=settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+                  window_seconds=settings.LOGIN_RATE_LIMIT_WINDOW_SECONDS,
+                  key="email", email_field="username"),
+    RateLimitRule("POST", "/auth/forgot-password",
+                  limit=settings.FORGOT_PASSWORD_RATE_LIMIT_PER_IP,
+                  window_seconds=settings.FORGOT_PASSWORD_RATE_LIMIT_WINDOW_SECONDS),
+    RateLimitRule("POST", "/auth/forgot-password",
+                  limit=settings.FORGOT_PASSWORD_RATE_LIMIT_PER_EMAIL,
+                  window_seconds=settings.FORGOT_PASSWORD_RATE_LIMIT_WINDOW_SECONDS,
+                  key="email"),
+]
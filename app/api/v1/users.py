@@ -1,42 +1,103 @@
-from fastapi import APIRouter, Depends, HTTPException
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
 from sqlmodel.ext.asyncio.session import AsyncSession
-from typing import List
+from typing import List, Optional
 from app.core.security import hash_password
-from app.core.db import get_session
+from app.core.config import settings
+from app.core.db import async_read_session, get_read_session, get_session
 from app.models.users import User
-from app.schemas.users import UserCreate, UserRead, UserReadBasic, UserUpdate, UserToAccount, MessageResponse
+from pydantic import ValidationError
+from app.schemas.users import (
+    UserCreate, UserRead, UserReadBasic, UserUpdate, UserToAccount, MessageResponse,
+    UserBulkItem, UserBulkReport, MembershipDiff, MembershipDiffResult, user_list_adapter,
+)
+from app.utils import accounts as account_utils
 from app.utils import users as user_utils
-from app.utils.auth import get_current_user
+from app.utils.auth import Principal, get_current_principal, get_current_user, require_account_member
+from app.utils.responses import etag_for, etag_matches, json_list_response, not_modified
 
 router = APIRouter()
 
+async def _stream_users_ndjson(account_id: int):
+    # Own session: the response body is produced after the route has returned
+    async with async_read_session() as session:
+        async for row in user_utils.stream_users_for_account(
+            account_id=account_id,
+            session=session
+        ):
+            yield json.dumps(row._asdict()) + "\n"
+
+
 # --- GET all users for a specific account ---
 @router.get("/{account_unique_id}", response_model=List[UserReadBasic])
 async def list_users(
-    account_unique_id: str, 
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)):
+    account_unique_id: str,
+    request: Request,
+    cursor: Optional[int] = Query(None, description="Last user id of the previous page"),
+    limit: int = Query(settings.USERS_PAGE_SIZE, ge=1, le=settings.USERS_PAGE_SIZE_MAX),
+    stream: bool = Query(False, description="Stream every user as NDJSON instead of paging"),
+    current_user: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_read_session)):
     """
-    Retrieve all users for a specific account from the database."""
-    users = await user_utils.get_users_for_account(
+    Retrieve users for a specific account, one page at a time ordered by id.
+    The next page's cursor is returned in the X-Next-Cursor header.
+    Conditional requests are answered from the page's user versions alone.
+    """
+    require_account_member(current_user, account_unique_id)
+    account_id = await account_utils.get_account_id_by_account_unique_id(
         account_unique_id=account_unique_id,
         session=session
     )
-    return users
+    if account_id is None:
+        return json_list_response(user_list_adapter, [])
+
+    if stream:
+        return StreamingResponse(
+            _stream_users_ndjson(account_id),
+            media_type="application/x-ndjson"
+        )
+
+    # Fetch one extra row to know whether another page exists
+    if request.headers.get("if-none-match"):
+        versions = await user_utils.get_users_for_account(
+            account_id=account_id,
+            session=session,
+            after_id=cursor,
+            limit=limit + 1,
+            columns=user_utils.USER_VERSION_COLUMNS
+        )
+        etag = etag_for(versions)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+    users = await user_utils.get_users_for_account(
+        account_id=account_id,
+        session=session,
+        after_id=cursor,
+        limit=limit + 1,
+        columns=(*user_utils.USER_BASIC_COLUMNS, User.version)
+    )
+    headers = {"ETag": etag_for((user.id, user.version) for user in users)}
+    if len(users) > limit:
+        users = users[:limit]
+        headers["X-Next-Cursor"] = str(users[-1].id)
+    return json_list_response(user_list_adapter, users, headers=headers)
 
 
 # --- GET user by ID ---
 @router.get("/get-user/{user_id}", response_model=UserReadBasic)
 async def get_user(
     user_id: int,
-    current_user: User = Depends(get_current_user),
-    session: AsyncSession = Depends(get_session)
+    current_user: Principal = Depends(get_current_principal),
+    session: AsyncSession = Depends(get_read_session)
 ):
     """
     Retrieve a user by ID from the database."""
-    user = await session.get(User, user_id)
-    print("User fetched:", user)
+    user = await user_utils.get_user_basic_by_id(user_id, session)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -45,7 +106,7 @@ async def get_user(
 @router.post("/", response_model=UserReadBasic)
 async def create_user(
     user: UserCreate,
-    current_user: User = Depends(get_current_user), 
+    current_user: Principal = Depends(get_current_user), 
     session: AsyncSession = Depends(get_session)):
     """
     Create a new user in the database and assign to multiple accounts.
@@ -57,24 +118,88 @@ async def create_user(
             account_ids=user.account_ids[0],  # assuming at least one account is provided
             session=session
         )
+        await session.commit()
         return existing_user
 
     new_user = await user_utils.create_new_user_in_db(
         email=user.email,
-        password=hash_password(user.password),
+        password=await hash_password(user.password),
         full_name=user.full_name,
         account_ids=user.account_ids,
         session=session
     )
+    await session.commit()
     return new_user
 
 
+async def _bulk_create(account_unique_id: str, items: List[UserBulkItem], session: AsyncSession):
+    if len(items) > settings.BULK_USERS_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_USERS_MAX_ROWS} users can be provisioned per request"
+        )
+    # From the primary, not the account cache: a cached entry can outlive
+    # the account's deletion on another worker
+    account = await account_utils.get_account_by_account_unique_id(
+        account_unique_id=account_unique_id,
+        session=session
+    )
+    if account is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    report = await user_utils.bulk_create_users_for_account(
+        account_id=account.id,
+        items=items,
+        session=session
+    )
+    await session.commit()
+    return report
+
+
+# --- POST bulk create users for an account ---
+@router.post("/bulk/{account_unique_id}", response_model=UserBulkReport)
+async def bulk_create_users(
+    account_unique_id: str,
+    users: List[UserBulkItem],
+    current_user: Principal = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)):
+    """
+    Create many users, or link existing ones, to an account in one transaction.
+    Returns a per-row result report.
+    """
+    return await _bulk_create(account_unique_id, users, session)
+
+
+# --- POST bulk create users for an account from CSV ---
+@router.post("/bulk/{account_unique_id}/csv", response_model=UserBulkReport)
+async def bulk_create_users_csv(
+    account_unique_id: str,
+    file: UploadFile = File(..., description="CSV with email, password and full_name columns"),
+    current_user: Principal = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)):
+    """
+    Same as the JSON bulk endpoint, reading users from an uploaded CSV file.
+    """
+    content = await file.read()
+    try:
+        items = [
+            UserBulkItem(
+                email=(row.get("email") or "").strip(),
+                password=row.get("password") or None,
+                full_name=row.get("full_name") or None,
+            )
+            for row in csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+        ]
+    except (csv.Error, UnicodeDecodeError, ValidationError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {e}")
+    return await _bulk_create(account_unique_id, items, session)
+
+
 # --- PUT update user ---
 @router.put("/{user_id}", response_model=UserRead)
 async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -89,6 +214,7 @@ async def update_user(
         full_name=user_update.full_name,
         session=session
     )
+    await session.commit()
     return user
 
 
@@ -97,7 +223,7 @@ async def update_user(
 async def add_user_to_account(
     account_id: List[int],
     user: UserToAccount,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -106,21 +232,55 @@ async def add_user_to_account(
     """
     existing_user = await user_utils.get_user_with_accounts_by_email(email=user.email, session=session)
     if existing_user:
-        await user_utils.add_user_to_accounts(
+        added = await user_utils.add_user_to_accounts(
             user=existing_user,
             account_ids=account_id,  # assuming at least one account is provided
             session=session
         )
-        return await user_utils.get_user_with_accounts_by_id(existing_user.id, session)
+        if added:
+            await user_utils.reload_user_accounts(existing_user, session)
+        await session.commit()
+        return existing_user
 
     new_user = await user_utils.create_new_user_in_db(
         email=user.email,
-        password=hash_password(user.password),
+        password=await hash_password(user.password),
         full_name=user.full_name,
         account_ids=account_id,
         session=session
     )
-    return await user_utils.get_user_with_accounts_by_id(new_user.id, session)
+    await session.commit()
+    return new_user
+
+
+# --- PATCH apply a membership diff ---
+@router.patch("/memberships/", response_model=MembershipDiffResult)
+async def apply_membership_diff(
+    diff: MembershipDiff,
+    current_user: Principal = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Add and remove account memberships for one or many users in one
+    transaction. Existing memberships and unknown ids are skipped; only the
+    affected counts are returned.
+    """
+    if len(diff.user_ids) > settings.BULK_USERS_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_USERS_MAX_ROWS} users can be changed per request"
+        )
+    if set(diff.add_account_ids) & set(diff.remove_account_ids):
+        raise HTTPException(status_code=400, detail="An account cannot be both added and removed")
+
+    result = await user_utils.apply_membership_diff(
+        user_ids=diff.user_ids,
+        add_account_ids=diff.add_account_ids,
+        remove_account_ids=diff.remove_account_ids,
+        session=session
+    )
+    await session.commit()
+    return result
 
 
 # ---PUT remove user from account ---
@@ -128,13 +288,13 @@ async def add_user_to_account(
 async def remove_user_from_account(
     user_id: int,
     account_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """
     Remove a user from an account.
     """
-    user = await user_utils.get_user_with_accounts_by_id(user_id, session)
+    user = await session.get(User, user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -144,8 +304,9 @@ async def remove_user_from_account(
         session=session
     )
 
-    if len(user.accounts) == 0:
+    if await user_utils.count_user_accounts(user.id, session) == 0:
         await user_utils.delete_user_in_db(user=user, session=session)
+    await session.commit()
 
     return {"message": "User removed from account successfully"}
 
@@ -155,7 +316,7 @@ async def remove_user_from_account(
 @router.delete("/{user_id}", response_model=dict)
 async def delete_user(
     user_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
     """
@@ -165,5 +326,6 @@ async def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
     
     await user_utils.delete_user_in_db(user=user, session=session)
-    
+    await session.commit()
+
     return {"detail": "User deleted successfully"}
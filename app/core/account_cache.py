@@ -0,0 +1,95 @@
+import asyncio
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import Protocol
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedAccount:
+    """
+    The columns of an Account that read routes need, safe to share across
+    requests.
+    """
+    id: int
+    account_organisation: str
+    account_unique_id: str
+    version: int
+
+
+class AccountCacheBackend(Protocol):
+    """
+    Optional shared store behind the in-process cache, so workers can reuse
+    each other's lookups and see each other's invalidations.
+    """
+    async def get(self, account_unique_id: str) -> CachedAccount | None:
+        ...
+
+    async def set(self, account_unique_id: str, account: CachedAccount):
+        ...
+
+    async def delete(self, account_unique_id: str):
+        ...
+
+
+class AccountCache:
+    """
+    Maps account_unique_id to the account's id and columns.
+
+    Uses the same version stamps as the principal cache: a lookup that
+    started before an invalidation cannot store the row it read.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float, backend: AccountCacheBackend | None = None):
+        self.backend = backend
+        self._entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._versions = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds * 2)
+        self._counter = itertools.count(1)
+        self._pending: set[asyncio.Task] = set()
+
+    def version(self, account_unique_id: str) -> int:
+        return self._versions.get(account_unique_id) or 0
+
+    async def get(self, account_unique_id: str) -> CachedAccount | None:
+        version = self.version(account_unique_id)
+        account = self._entries.get((account_unique_id, version))
+        if account is None and self.backend is not None:
+            account = await self.backend.get(account_unique_id)
+            if account is not None:
+                self._entries.set((account_unique_id, version), account)
+        return account
+
+    async def set(self, account_unique_id: str, account: CachedAccount, version: int):
+        if version != self.version(account_unique_id):
+            return  # invalidated while the row was being read
+        self._entries.set((account_unique_id, version), account)
+        if self.backend is not None:
+            await self.backend.set(account_unique_id, account)
+
+    def invalidate(self, *account_unique_ids: str):
+        for account_unique_id in account_unique_ids:
+            self._entries.delete((account_unique_id, self.version(account_unique_id)))
+            self._versions.set(account_unique_id, next(self._counter))
+            if self.backend is not None:
+                # Called from commit hooks, which cannot await
+                task = asyncio.get_running_loop().create_task(self._delete_shared(account_unique_id))
+                self._pending.add(task)
+                task.add_done_callback(self._pending.discard)
+
+    async def _delete_shared(self, account_unique_id: str):
+        try:
+            await self.backend.delete(account_unique_id)
+        except Exception:
+            logger.exception("Failed to invalidate account %s in the shared cache", account_unique_id)
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+account_cache = AccountCache(
+    max_entries=settings.ACCOUNT_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.ACCOUNT_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+_READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request can neither run nor wait for a free slot."""
+
+
+class AdmissionGroup:
+    """
+    Adaptive concurrency limit for one group of routes (AIMD).
+
+    Each request that finishes within target_latency_ms raises the limit by
+    about one per limit's worth of requests; a slower one cuts it by
+    `backoff`, at most once per target latency so one burst of slow requests
+    counts once. Requests over the limit wait in a bounded FIFO queue for up
+    to queue_timeout_seconds.
+    """
+    def __init__(
+        self,
+        name: str,
+        min_limit: int,
+        max_limit: int,
+        target_latency_ms: float,
+        queue_size: int,
+        queue_timeout_seconds: float,
+        backoff: float = 0.9,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.target_latency = target_latency_ms / 1000
+        self.queue_size = queue_size
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.backoff = backoff
+        self.limit = float(max_limit)
+        self.in_flight = 0
+        self.rejected = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._last_decrease = 0.0
+
+    async def acquire(self):
+        if self.in_flight < int(self.limit) and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            raise AdmissionRejected(self.name)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # release() hands its slot over, so in_flight is already counted
+            await asyncio.wait_for(waiter, self.queue_timeout_seconds)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                self.release(None)  # slot handed over just as the wait ended
+            else:
+                self._waiters.remove(waiter)
+            if isinstance(exc, asyncio.TimeoutError):
+                self.rejected += 1
+                raise AdmissionRejected(self.name) from None
+            raise
+
+    def release(self, latency: float | None):
+        if latency is not None:
+            self._adjust(latency)
+        self.in_flight -= 1
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _adjust(self, latency: float):
+        if latency <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            return
+        now = time.monotonic()
+        if now - self._last_decrease >= self.target_latency:
+            self._last_decrease = now
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+            logger.debug("Admission limit for %s lowered to %.1f", self.name, self.limit)
+
+    def retry_after_seconds(self) -> int:
+        return max(1, round(self.queue_timeout_seconds))
+
+    def stats(self) -> dict:
+        return {
+            "limit": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": len(self._waiters),
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that caps concurrent API requests per route group: "auth"
+    for everything under /auth, "reads" for other GET/HEAD requests and
+    "writes" for the rest. Requests outside the API prefix (/health, /ready,
+    /metrics) are never limited. Rejections are fast 503 responses with
+    Retry-After instead of requests piling up on the pool or the hasher.
+
+    Latency samples end when the response starts, so streamed bodies do not
+    count as slow. Routes under unsampled_paths (long-running by design,
+    like bulk provisioning) still take a slot but never adjust the limit.
+    """
+    def __init__(self, app, groups: dict[str, AdmissionGroup], prefix: str = "", unsampled_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.groups = groups
+        self.prefix = prefix
+        self.unsampled_paths = tuple(prefix + path for path in unsampled_paths)
+
+    def _group_for(self, scope) -> AdmissionGroup | None:
+        path = scope.get("path", "")
+        if not path.startswith(self.prefix + "/"):
+            return None
+        if path.startswith(self.prefix + "/auth/"):
+            return self.groups.get("auth")
+        return self.groups.get("reads" if scope.get("method") in _READ_METHODS else "writes")
+
+    async def __call__(self, scope, receive, send):
+        group = self._group_for(scope) if scope["type"] == "http" else None
+        if group is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            await group.acquire()
+        except AdmissionRejected:
+            return await _service_unavailable(send, group.retry_after_seconds())
+
+        started = time.perf_counter()
+        latency = None
+        sampled = not scope["path"].startswith(self.unsampled_paths)
+
+        async def timed_send(message):
+            nonlocal latency
+            if message["type"] == "http.response.start" and sampled:
+                latency = time.perf_counter() - started
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            # Requests that never started a response free their slot without a sample
+            group.release(latency)
+
+
+async def _service_unavailable(send, retry_after: int):
+    body = json.dumps({"detail": "Server is busy, please retry shortly"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 503,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
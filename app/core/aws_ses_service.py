@@ -1,13 +1,8 @@
-import os
-import boto3
-from botocore.exceptions import ClientError
-from dotenv import load_dotenv
-from pathlib import Path
+import logging
+from functools import cached_property
 from app.core.config import settings
 
-
-env_path = Path(".") / ".env"
-load_dotenv(dotenv_path=env_path)
+logger = logging.getLogger(__name__)
 
 # A dependency provider function
 _email_service_singleton = None
@@ -21,18 +16,27 @@ def get_email_service():
 
 class EmailService:
     def __init__(self):
-        self.ses = boto3.client(
+        self.sender_email = settings.AWS_SES_VERIFIED_MAIL
+
+    @cached_property
+    def ses(self):
+        """
+        The SES client, created on first send. boto3 is imported here because
+        importing it costs more than the rest of the app's startup."""
+        import boto3
+        return boto3.client(
             "ses",
             region_name=settings.AWS_SES_REGION,
             aws_access_key_id=settings.AWS_ACCESS_KEY,
             aws_secret_access_key=settings.AWS_SECRET_KEY,
         )
-        self.sender_email = settings.AWS_SES_VERIFIED_MAIL
 
     def send_email(self, to_email: str, subject: str, text_body: str, html_body: str):
         """
         Sends an email with both HTML and plain text content.
         """
+        from botocore.exceptions import ClientError
+
         try:
             response = self.ses.send_email(
                 Source=self.sender_email,
@@ -45,42 +49,54 @@ class EmailService:
                     },
                 },
             )
-            print(f"Email sent successfully. MessageId: {response['MessageId']}")
+            logger.info("Email sent successfully. MessageId: %s", response["MessageId"])
             return response["MessageId"]
         except ClientError as e:
-            print(f"Email sending failed: {e.response['Error']['Message']}")
+            logger.error("Email sending failed: %s", e.response["Error"]["Message"])
             raise Exception(f"Email sending failed: {e.response['Error']['Message']}")
 
     def send_password_reset_email(self, to_email: str, reset_link: str):
             """
             Constructs and sends a password reset email.
             """
-            subject = "Your Password Reset Link"
-            
-            html_body = f"""
-            <html>
-            <body>
-            <h1>Password Reset Request</h1>
-            <p>We received a request to reset your password. Click the link below to proceed.</p>
-            <a href="{reset_link}">Reset Your Password</a>
-            <p>This link will expire in 1 hour.</p>
-            </body>
-            </html>
-            """
-            
-            text_body = f"""
-            Password Reset Request
-            
-            Please use the following link to reset your password: {reset_link}
-            
-            This link will expire in 1 hour.
-            """
-            
             # Call the generic sender method
             return self.send_email(
                 to_email=to_email,
-                subject=subject,
-                html_body=html_body,
-                text_body=text_body
+                **build_password_reset_email(reset_link)
             )
-    
\ No newline at end of file
+
+
+def _format_expiry(minutes: int) -> str:
+    if minutes % 60 == 0:
+        hours = minutes // 60
+        return f"{hours} hour{'s' if hours != 1 else ''}"
+    return f"{minutes} minute{'s' if minutes != 1 else ''}"
+
+
+def build_password_reset_email(reset_link: str) -> dict:
+    """
+    Builds the subject and bodies of a password reset email.
+    """
+    subject = "Your Password Reset Link"
+    expiry = _format_expiry(settings.PASSWORD_RESET_TOKEN_EXPIRE_MINUTES)
+
+    html_body = f"""
+    <html>
+    <body>
+    <h1>Password Reset Request</h1>
+    <p>We received a request to reset your password. Click the link below to proceed.</p>
+    <a href="{reset_link}">Reset Your Password</a>
+    <p>This link will expire in {expiry}.</p>
+    </body>
+    </html>
+    """
+
+    text_body = f"""
+    Password Reset Request
+
+    Please use the following link to reset your password: {reset_link}
+
+    This link will expire in {expiry}.
+    """
+
+    return {"subject": subject, "text_body": text_body, "html_body": html_body}
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicTask:
+    """
+    Runs an async job on a fixed interval in the background of the app.
+    The job can return True to be run again immediately (e.g. more work is
+    queued), and wake() cuts the current wait short.
+    """
+    def __init__(self, name: str, interval_seconds: float, job: Callable[[], Awaitable[bool | None]]):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.job = job
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    def wake(self):
+        self._wake.set()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                more = await self.job()
+            except Exception:
+                logger.exception("Background task %s failed", self.name)
+                more = False
+            if more:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
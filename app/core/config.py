@@ -4,6 +4,7 @@ class Settings(BaseSettings):
     PROJECT_NAME: str = "FastAPI Starter Kit"
     API_V1_PREFIX: str = "/api/v1"
     ENV: str = "development"  # default to dev
+    LOG_LEVEL: str = "INFO"
     DATABASE_URL: str  # must be provided in env
     FE_BASE_URL: str  # Frontend base URL
     AWS_SES_REGION: str
@@ -14,9 +15,148 @@ class Settings(BaseSettings):
     # JWT settings
     SECRET_KEY: str
     ALGORITHM: str
-    ACCESS_TOKEN_EXPIRE_MINUTES: int
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # keep short; clients renew via /auth/refresh
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    REVOCATION_SYNC_SECONDS: float = 5  # how often workers pull revoked token ids
+    ACCESS_TOKEN_FORMAT: str = "legacy"  # "scoped" embeds user id, memberships and version
+    TOKEN_REVALIDATE_SECONDS: int = 60  # scoped tokens older than this re-check their version
+    TOKEN_VERSION_CACHE_SECONDS: float = 10  # how long a re-checked version is trusted per worker
+
+    # Password hashing worker pool
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 64  # in-flight hash/verify calls before shedding
+
+    # Startup warm-up reported by /ready
+    WARMUP_ENABLED: bool = True
+    WARMUP_RETRY_SECONDS: float = 5  # wait before retrying a failed warm-up
+
+    # Password reset tokens: "database" rows, or "signed" stateless HMAC tokens
+    PASSWORD_RESET_TOKEN_MODE: str = "database"
+    PASSWORD_RESET_TOKEN_EXPIRE_MINUTES: int = 60
+
+    # Background purge of expired reset, refresh and revoked token rows, and old outbox emails
+    TOKEN_PURGE_INTERVAL_SECONDS: float = 600
+    TOKEN_PURGE_BATCH_SIZE: int = 1000
+
+    # Authenticated principal cache used by get_current_user
+    AUTH_CACHE_TTL_SECONDS: float = 30
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+
+    # Rate limits on the auth endpoints (token buckets, see app/api/v1/routes.py)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_TRUST_FORWARDED_FOR: bool = False  # enable only behind a proxy that sets it
+    RATE_LIMIT_MAX_KEYS: int = 100000  # tracked clients per rule
+    LOGIN_RATE_LIMIT_PER_IP: int = 30
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = 5
+    LOGIN_RATE_LIMIT_WINDOW_SECONDS: float = 60
+    FORGOT_PASSWORD_RATE_LIMIT_PER_IP: int = 10
+    FORGOT_PASSWORD_RATE_LIMIT_PER_EMAIL: int = 3
+    FORGOT_PASSWORD_RATE_LIMIT_WINDOW_SECONDS: float = 3600
+
+    # Adaptive concurrency limits per route group (see app/core/admission.py)
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_MIN_CONCURRENCY: int = 2
+    ADMISSION_AUTH_MAX_CONCURRENCY: int = 16  # bcrypt-bound; a few times PASSWORD_HASH_WORKERS
+    ADMISSION_AUTH_TARGET_LATENCY_MS: float = 500
+    ADMISSION_READ_MAX_CONCURRENCY: int = 64
+    ADMISSION_READ_TARGET_LATENCY_MS: float = 200
+    ADMISSION_WRITE_MAX_CONCURRENCY: int = 32
+    ADMISSION_WRITE_TARGET_LATENCY_MS: float = 300
+    ADMISSION_QUEUE_SIZE: int = 100  # waiting requests per group before rejecting
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 2
+
+    # Account lookup cache keyed by account_unique_id
+    ACCOUNT_CACHE_TTL_SECONDS: float = 300
+    ACCOUNT_CACHE_MAX_ENTRIES: int = 10000
+
+    # Database engine and connection pool
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30  # seconds to wait for a connection before erroring
+    DB_POOL_RECYCLE: int = 1800  # seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_CACHE_SIZE: int = 500  # asyncpg prepared statements per connection
+    DB_QUERY_CACHE_SIZE: int = 1200  # SQLAlchemy compiled statement cache
+    SQLITE_POOL_SIZE: int = 5
+    SQLITE_MAX_OVERFLOW: int = 5
+
+    # Read replicas, used by routes that depend on get_read_session
+    DATABASE_REPLICA_URLS: str = ""  # comma-separated; empty sends reads to the primary
+    DB_REPLICA_HEALTH_CHECK_SECONDS: float = 10
+
+    # User listing pagination
+    USERS_PAGE_SIZE: int = 100
+    USERS_PAGE_SIZE_MAX: int = 1000
+
+    # Bulk user provisioning
+    BULK_USERS_MAX_ROWS: int = 10000
+    BULK_USERS_CHUNK_SIZE: int = 500  # rows per IN lookup / multi-row insert
+
+    # Email outbox delivery
+    EMAIL_TRANSPORT: str = "ses"  # "ses", or "fake" to keep mail in memory
+    EMAIL_OUTBOX_ENABLED: bool = False  # enable in one process only, or run python -m app.core.email_outbox
+    EMAIL_OUTBOX_POLL_SECONDS: float = 5
+    EMAIL_OUTBOX_BATCH_SIZE: int = 50
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = 5
+    EMAIL_OUTBOX_BACKOFF_SECONDS: float = 30  # doubled after every failed attempt
+    EMAIL_OUTBOX_LEASE_SECONDS: float = 300  # claimed messages are retried if not sent by then
+    EMAIL_OUTBOX_RETENTION_HOURS: float = 24  # sent and failed messages are purged after this
+    SES_MAX_SEND_RATE: float = 14  # emails per second allowed by the SES quota, enforced per dispatcher
+
+    # Request timing and SQL instrumentation
+    SERVER_TIMING_HEADER: bool = True
+    SLOW_REQUEST_THRESHOLD_MS: float = 500  # slower requests log their statements
+    SLOW_REQUEST_MAX_STATEMENTS: int = 100  # statements kept per request for that log
 
     class Config:
         env_file = ".env"
 
+    @property
+    def database_url(self) -> str:
+        """
+        Async database URL for the current environment."""
+        if self.ENV == "development":
+            # Local SQLite async
+            return "sqlite+aiosqlite:///dev.db"
+        # Production PostgreSQL async
+        return self.DATABASE_URL.replace("postgres://", "postgresql+asyncpg://")
+
+    @property
+    def replica_urls(self) -> list[str]:
+        """
+        Async database URLs of the read replicas, if any."""
+        return [
+            url.strip().replace("postgres://", "postgresql+asyncpg://")
+            for url in self.DATABASE_REPLICA_URLS.split(",")
+            if url.strip()
+        ]
+
+    def engine_options(self, url: str) -> dict:
+        """
+        Keyword arguments for create_async_engine, using the profile that
+        matches the database backend in the URL.
+        """
+        options = {
+            "echo": self.DB_ECHO,
+            "pool_timeout": self.DB_POOL_TIMEOUT,
+            "query_cache_size": self.DB_QUERY_CACHE_SIZE,
+        }
+        if url.startswith("sqlite"):
+            # Local file: connections are cheap and never go stale
+            options.update(
+                pool_size=self.SQLITE_POOL_SIZE,
+                max_overflow=self.SQLITE_MAX_OVERFLOW,
+            )
+        else:
+            options.update(
+                pool_size=self.DB_POOL_SIZE,
+                max_overflow=self.DB_MAX_OVERFLOW,
+                pool_recycle=self.DB_POOL_RECYCLE,
+                pool_pre_ping=self.DB_POOL_PRE_PING,
+                connect_args={"prepared_statement_cache_size": self.DB_STATEMENT_CACHE_SIZE},
+            )
+        return options
+
 settings = Settings()
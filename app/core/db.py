@@ -1,30 +1,241 @@
-import os
-from sqlmodel import SQLModel
-from sqlalchemy.ext.asyncio import create_async_engine
+import itertools
+import logging
+import time
+from sqlmodel import Session, SQLModel
+from sqlalchemy import Select, event, text
+from sqlalchemy.exc import InterfaceError, OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session as OrmSession, sessionmaker
+from app.core.background import PeriodicTask
 from app.core.config import settings
 
-# Decide DB URL based on environment
-if settings.ENV == "development":
-    # Local SQLite async
-    DB_FILE = "dev.db"
-    DATABASE_URL = f"sqlite+aiosqlite:///{DB_FILE}"
-else:
-    # Production PostgreSQL async
-    DATABASE_URL = settings.DATABASE_URL.replace(
-        "postgres://", "postgresql+asyncpg://"
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Queue pool that records how long callers wait to check out a connection.
+    """
+    # Log under the stock pool's name so LOG_LEVEL=DEBUG for the app does not
+    # turn on per-checkout pool logging; it stays controlled by sqlalchemy.pool
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.AsyncAdaptedQueuePool"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_count += 1
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+
+def create_engine_from_settings(url: str) -> AsyncEngine:
+    """
+    Builds an async engine using the pool profile for the URL's backend.
+    """
+    return create_async_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        **settings.engine_options(url),
     )
 
+
+def pool_status(engine: AsyncEngine) -> dict:
+    """
+    Snapshot of live connection pool statistics for an engine.
+    """
+    pool = engine.sync_engine.pool
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(
+            waits=pool.wait_count,
+            wait_ms_total=round(pool.wait_seconds_total * 1000, 2),
+            wait_ms_max=round(pool.wait_seconds_max * 1000, 2),
+            timeouts=pool.timeouts,
+        )
+    return status
+
+
+def after_commit(session: AsyncSession, callback, *args):
+    """
+    Runs callback(*args) once the session's current transaction commits.
+    Helpers only flush, so side effects such as cache invalidation are
+    deferred to the route's single commit and dropped on rollback.
+    """
+    session.sync_session.info.setdefault("after_commit", []).append((callback, args))
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _run_after_commit(session):
+    for callback, args in session.info.pop("after_commit", []):
+        callback(*args)
+
+
+@event.listens_for(OrmSession, "after_soft_rollback")
+def _discard_after_commit(session, previous_transaction):
+    session.info.pop("after_commit", None)
+
+
+DATABASE_URL = settings.database_url
+
 # Create async engine
-async_engine = create_async_engine(DATABASE_URL, echo=True)
+async_engine = create_engine_from_settings(DATABASE_URL)
 
 # Async session factory
 async_session = sessionmaker(
     async_engine, class_=AsyncSession, expire_on_commit=False
 )
 
+
+
+class ReplicaSet:
+    """
+    Read replica engines, handed out round-robin. A background health check
+    takes failing replicas out of rotation and puts them back once they
+    answer again; with none healthy, reads go to the primary.
+    """
+    def __init__(self, engines: list[AsyncEngine]):
+        self.engines = engines
+        self._healthy = list(engines)
+        self._counter = itertools.count()
+        self.task = PeriodicTask(
+            name="replica-health-check",
+            interval_seconds=settings.DB_REPLICA_HEALTH_CHECK_SECONDS,
+            job=self.check,
+        )
+        for engine in engines:
+            event.listen(engine.sync_engine, "handle_error", self._on_error)
+
+    def pick(self) -> AsyncEngine | None:
+        healthy = self._healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def mark_unhealthy(self, engine: AsyncEngine):
+        if engine in self._healthy:
+            logger.warning("Read replica %s taken out of rotation", engine.url.render_as_string())
+            self._healthy = [e for e in self._healthy if e is not engine]
+
+    def _on_error(self, exception_context):
+        # A dropped connection means the replica is likely down; stop routing to it now
+        if exception_context.is_disconnect:
+            for engine in self.engines:
+                if engine.sync_engine is exception_context.engine:
+                    self.mark_unhealthy(engine)
+
+    async def check(self):
+        healthy = []
+        for engine in self.engines:
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except Exception:
+                logger.warning("Read replica %s failed its health check", engine.url.render_as_string())
+            else:
+                healthy.append(engine)
+        self._healthy = healthy
+
+    def status(self) -> list[dict]:
+        return [
+            {"healthy": engine in self._healthy, **pool_status(engine)}
+            for engine in self.engines
+        ]
+
+    def start(self):
+        if self.engines:
+            self.task.start()
+
+    async def stop(self):
+        await self.task.stop()
+
+
+replica_set = ReplicaSet([create_engine_from_settings(url) for url in settings.replica_urls])
+
+
+class RoutingSession(Session):
+    """
+    Session that sends SELECTs to a healthy read replica and everything else
+    to the primary. The replica is picked on the first read and kept for the
+    session's lifetime, so its reads never go back in time by hopping to a
+    replica that lags further behind. After its first flush the session stays
+    on the primary, so a request reads its own writes. A read that fails on
+    the replica takes it out of rotation and is retried on the primary,
+    where the rest of the session's reads then go.
+
+    Reads here can lag the primary. In particular, get_current_principal
+    loads legacy-token principals through this session, so a replica that
+    has not yet applied a write can have the pre-write principal cached in
+    principal_cache under the version stamp taken after the write's
+    invalidation, until AUTH_CACHE_TTL_SECONDS passes.
+    """
+    def _read_replica(self, clause) -> AsyncEngine | None:
+        if not isinstance(clause, Select) or self._flushing or self.info.get("pinned_to_primary"):
+            return None
+        if "replica" not in self.info:
+            self.info["replica"] = replica_set.pick()
+        return self.info["replica"]
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        replica = self._read_replica(clause)
+        if replica is not None:
+            return replica.sync_engine
+        return async_engine.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _pin_to_primary(session, flush_context):
+    session.info["pinned_to_primary"] = True
+
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _retry_failed_replica_read(orm_execute_state):
+    session = orm_execute_state.session
+    replica = session._read_replica(orm_execute_state.statement)
+    if replica is None:
+        return None
+    try:
+        return orm_execute_state.invoke_statement()
+    except (OperationalError, InterfaceError) as e:
+        # Connection-level failure, not a problem with the query itself
+        logger.warning("Read on replica %s failed, retrying on the primary: %s",
+                       replica.url.render_as_string(), e)
+        replica_set.mark_unhealthy(replica)
+        session.info["replica"] = None
+        return orm_execute_state.invoke_statement()
+
+
+# Session factory for read-mostly work that may be served by a replica
+async_read_session = sessionmaker(
+    async_engine, class_=AsyncSession, sync_session_class=RoutingSession, expire_on_commit=False
+)
+
 # Dependency for FastAPI routes
 async def get_session() -> AsyncSession:
     async with async_session() as session:
         yield session
+
+
+# Dependency for read-only routes; falls back to the primary without replicas
+async def get_read_session() -> AsyncSession:
+    async with async_read_session() as session:
+        yield session
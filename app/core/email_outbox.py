@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Protocol
+from sqlalchemy import update
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.core.aws_ses_service import build_password_reset_email, get_email_service
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.db import async_session
+from app.models.email import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"  # claimed by a dispatcher until next_attempt_at
+SENT = "sent"
+FAILED = "failed"
+
+
+class EmailTransport(Protocol):
+    """
+    Delivers one email and returns the provider's message id.
+    """
+    async def send(self, to_email: str, subject: str, text_body: str, html_body: str) -> str:
+        ...
+
+
+class SESTransport:
+    """
+    Sends through AWS SES. boto3 is blocking, so calls run in a thread.
+    """
+    async def send(self, to_email: str, subject: str, text_body: str, html_body: str) -> str:
+        return await asyncio.to_thread(
+            get_email_service().send_email,
+            to_email=to_email,
+            subject=subject,
+            text_body=text_body,
+            html_body=html_body,
+        )
+
+
+class FakeSESTransport:
+    """
+    In-memory stand-in for SES for local development and tests. Set
+    fail_next to make the next N sends raise.
+    """
+    def __init__(self):
+        self.sent: list[dict] = []
+        self.fail_next = 0
+
+    async def send(self, to_email: str, subject: str, text_body: str, html_body: str) -> str:
+        if self.fail_next > 0:
+            self.fail_next -= 1
+            raise RuntimeError("Simulated SES failure")
+        message_id = uuid.uuid4().hex
+        self.sent.append({
+            "message_id": message_id,
+            "to_email": to_email,
+            "subject": subject,
+            "text_body": text_body,
+            "html_body": html_body,
+        })
+        return message_id
+
+
+class _SendRateLimiter:
+    """
+    Spaces sends so they never exceed the SES per-second quota.
+    """
+    def __init__(self, max_per_second: float):
+        self.interval = 1 / max_per_second if max_per_second > 0 else 0
+        self._next_send = 0.0
+
+    async def acquire(self):
+        now = time.monotonic()
+        wait = self._next_send - now
+        self._next_send = max(now, self._next_send) + self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class EmailDispatcher:
+    """
+    Drains the email outbox in batches: sends due messages through the
+    transport, retries failures with exponential backoff and gives up after
+    EMAIL_OUTBOX_MAX_ATTEMPTS.
+
+    A batch is first claimed in a short transaction that marks the rows as
+    sending with a lease; sends happen with no transaction or connection
+    held, and each result is recorded on its own. Rows whose lease expires
+    (the worker died mid-batch) are claimed again.
+
+    SES_MAX_SEND_RATE is enforced per dispatcher, so run exactly one: set
+    EMAIL_OUTBOX_ENABLED in a single app process, or run this module as a
+    dedicated process and leave it off in the web workers.
+    """
+    def __init__(self, transport: EmailTransport):
+        self.transport = transport
+        self.batch_size = settings.EMAIL_OUTBOX_BATCH_SIZE
+        self.lease = timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+        self.max_attempts = settings.EMAIL_OUTBOX_MAX_ATTEMPTS
+        self.backoff_seconds = settings.EMAIL_OUTBOX_BACKOFF_SECONDS
+        self.rate_limiter = _SendRateLimiter(settings.SES_MAX_SEND_RATE)
+        self.task = PeriodicTask(
+            name="email-outbox",
+            interval_seconds=settings.EMAIL_OUTBOX_POLL_SECONDS,
+            job=self.dispatch_pending,
+        )
+
+    def _backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.backoff_seconds * 2 ** (attempts - 1), 3600))
+
+    async def _claim_batch(self) -> list:
+        """
+        Leases up to batch_size due messages and counts the attempt. Returns
+        their (id, to_email, subject, text_body, html_body, attempts) rows.
+        """
+        now = datetime.now()
+        due = (
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status.in_((PENDING, SENDING)))
+            .where(EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with async_session() as session:
+            result = await session.exec(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(due))
+                .values(status=SENDING, attempts=EmailOutbox.attempts + 1, next_attempt_at=now + self.lease)
+                .returning(
+                    EmailOutbox.id, EmailOutbox.to_email, EmailOutbox.subject,
+                    EmailOutbox.text_body, EmailOutbox.html_body, EmailOutbox.attempts,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            messages = result.all()
+            await session.commit()
+        return messages
+
+    async def _record(self, message_id: int, **values):
+        async with async_session() as session:
+            await session.exec(
+                update(EmailOutbox)
+                .where(EmailOutbox.id == message_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+    async def dispatch_pending(self) -> bool:
+        """
+        Sends one batch of due messages. Returns True when the batch was full
+        and more messages are likely waiting.
+        """
+        messages = await self._claim_batch()
+
+        for message in messages:
+            await self.rate_limiter.acquire()
+            try:
+                provider_message_id = await self.transport.send(
+                    to_email=message.to_email,
+                    subject=message.subject,
+                    text_body=message.text_body,
+                    html_body=message.html_body,
+                )
+            except Exception as e:
+                if message.attempts >= self.max_attempts:
+                    logger.error("Giving up on email %s to %s: %s", message.id, message.to_email, e)
+                    await self._record(message.id, status=FAILED, last_error=str(e)[:500])
+                else:
+                    logger.warning("Email %s to %s failed, will retry: %s", message.id, message.to_email, e)
+                    await self._record(
+                        message.id,
+                        status=PENDING,
+                        last_error=str(e)[:500],
+                        next_attempt_at=datetime.now() + self._backoff(message.attempts),
+                    )
+            else:
+                await self._record(
+                    message.id,
+                    status=SENT,
+                    provider_message_id=provider_message_id,
+                    sent_at=datetime.now(),
+                )
+        return len(messages) == self.batch_size
+
+    def start(self):
+        self.task.start()
+
+    def wake(self):
+        self.task.wake()
+
+    async def stop(self):
+        await self.task.stop()
+
+
+def _build_transport() -> EmailTransport:
+    if settings.EMAIL_TRANSPORT == "fake":
+        return FakeSESTransport()
+    return SESTransport()
+
+
+email_dispatcher = EmailDispatcher(transport=_build_transport())
+
+
+async def enqueue_email(to_email: str, subject: str, text_body: str, html_body: str, session: AsyncSession):
+    """
+    Stores an email in the outbox for background delivery.
+    """
+    message = EmailOutbox(to_email=to_email, subject=subject, text_body=text_body, html_body=html_body)
+    session.add(message)
+    await session.commit()
+    email_dispatcher.wake()
+    return message
+
+
+async def enqueue_password_reset_email(to_email: str, reset_link: str, session: AsyncSession):
+    """
+    Queues a password reset email for background delivery.
+    """
+    return await enqueue_email(
+        to_email=to_email,
+        session=session,
+        **build_password_reset_email(reset_link)
+    )
+
+
+async def run_dispatcher():
+    """
+    Runs the dispatcher on its own until cancelled. Without the web workers'
+    wake-ups, new messages are picked up every EMAIL_OUTBOX_POLL_SECONDS.
+    """
+    email_dispatcher.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await email_dispatcher.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=settings.LOG_LEVEL,
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    )
+    try:
+        asyncio.run(run_dispatcher())
+    except KeyboardInterrupt:
+        pass
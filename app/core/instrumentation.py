@@ -0,0 +1,128 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestMetrics:
+    """
+    Timing and SQL statistics collected for one request.
+    """
+    started: float = field(default_factory=time.perf_counter)
+    statement_count: int = 0
+    db_seconds: float = 0.0
+    slowest_statement: str | None = None
+    slowest_seconds: float = 0.0
+    statements: list[tuple[str, float]] = field(default_factory=list)
+
+    def record(self, statement: str, seconds: float):
+        self.statement_count += 1
+        self.db_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+        if len(self.statements) < settings.SLOW_REQUEST_MAX_STATEMENTS:
+            self.statements.append((statement, seconds))
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000
+
+
+_current_metrics: ContextVar[RequestMetrics | None] = ContextVar("request_metrics", default=None)
+
+
+def current_metrics() -> RequestMetrics | None:
+    return _current_metrics.get()
+
+
+def install_sql_hooks(engine: AsyncEngine):
+    """
+    Times every statement executed on the engine and attributes it to the
+    request being served, if any.
+    """
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        metrics = _current_metrics.get()
+        if metrics is not None:
+            metrics.record(statement, time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        # Keep the start-time stack balanced when a statement fails
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware that reports per-request latency and SQL usage as a
+    Server-Timing header and a structured log line. Requests slower than
+    SLOW_REQUEST_THRESHOLD_MS also log the statements they ran.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        metrics = RequestMetrics()
+        token = _current_metrics.set(metrics)
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING_HEADER:
+                    server_timing = (
+                        f'app;dur={metrics.elapsed_ms:.1f}, '
+                        f'db;dur={metrics.db_seconds * 1000:.1f};desc="{metrics.statement_count} queries"'
+                    )
+                    message.setdefault("headers", []).append((b"server-timing", server_timing.encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_metrics.reset(token)
+            self._log(scope, status_code, metrics)
+
+    def _log(self, scope, status_code: int, metrics: RequestMetrics):
+        elapsed_ms = metrics.elapsed_ms
+        record = {
+            "event": "request",
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "duration_ms": round(elapsed_ms, 2),
+            "db_statements": metrics.statement_count,
+            "db_ms": round(metrics.db_seconds * 1000, 2),
+            "slowest_statement_ms": round(metrics.slowest_seconds * 1000, 2),
+            "slowest_statement": metrics.slowest_statement,
+        }
+        if elapsed_ms >= settings.SLOW_REQUEST_THRESHOLD_MS:
+            record["event"] = "slow_request"
+            record["statements"] = [
+                {"sql": statement, "ms": round(seconds * 1000, 2)}
+                for statement, seconds in metrics.statements
+            ]
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
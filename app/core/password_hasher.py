@@ -0,0 +1,96 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from app.core.config import settings
+
+
+@lru_cache(maxsize=1)
+def _pwd_context():
+    # Built on first use in each worker (thread pool or process), keeping
+    # passlib and bcrypt out of application import time
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(password: str) -> str:
+    return _pwd_context().hash(password)
+
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return _pwd_context().verify(plain_password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    """
+    Raised when the hashing queue is full and the request should be shed.
+    """
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing and verification on a bounded worker pool so the
+    event loop stays free while the CPU-bound work runs.
+    """
+    def __init__(self, executor: str, max_workers: int, max_queue_depth: int):
+        self.executor_kind = executor
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self._executor: Executor | None = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="password-hasher",
+                )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._pending >= self.max_queue_depth:
+            raise PasswordHasherBusy("Password hashing queue is full")
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """
+        Hashes a plain password on the worker pool."""
+        return await self._run(_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Verifies a plain password against a hash on the worker pool."""
+        return await self._run(_verify, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """
+        Hashes a batch of passwords, keeping at most max_workers of them in
+        flight so interactive logins only ever queue behind one chunk."""
+        hashes: list[str] = []
+        for start in range(0, len(passwords), self.max_workers):
+            chunk = passwords[start:start + self.max_workers]
+            hashes.extend(await asyncio.gather(*(self.hash(password) for password in chunk)))
+        return hashes
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue_depth=settings.PASSWORD_HASH_MAX_QUEUE,
+)
@@ -0,0 +1,52 @@
+import itertools
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class PrincipalCache:
+    """
+    Caches the Principal (id, email, token version and memberships)
+    resolved by get_current_user.
+
+    Entries are keyed by token subject and a per-subject version stamp.
+    Invalidating a subject moves it to a new version, so a request that
+    loaded the user before a write cannot re-populate the cache with the
+    stale row after the write has committed.
+    """
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self._entries = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        # Invalidation marks only need to outlive any entry they could shadow
+        self._versions = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds * 2)
+        self._counter = itertools.count(1)
+        self._generation = 0
+
+    def version(self, subject: str) -> tuple[int, int]:
+        return self._generation, self._versions.get(subject) or 0
+
+    def get(self, subject: str):
+        return self._entries.get((subject, self.version(subject)))
+
+    def set(self, subject: str, user, version: tuple[int, int]):
+        self._entries.set((subject, version), user)
+
+    def invalidate(self, *subjects: str | None):
+        for subject in subjects:
+            if subject is None:
+                continue
+            self._entries.delete((subject, self.version(subject)))
+            self._versions.set(subject, next(self._counter))
+
+    def clear(self):
+        """
+        Drops every entry, e.g. after an account change visible to many users."""
+        self._generation += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return self._entries.stats()
+
+
+principal_cache = PrincipalCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+)
@@ -0,0 +1,226 @@
+import json
+import math
+import time
+from dataclasses import dataclass
+from typing import Protocol
+from starlette.datastructures import Headers
+from starlette.formparsers import FormParser, MultiPartException, MultiPartParser
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Bodies larger than this are rejected on routes limited per email
+_MAX_KEY_BODY_BYTES = 64 * 1024
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """
+    Allows `limit` requests per `window_seconds` to one route, per client IP
+    or, with key="email", per email address named by `email_field` in the
+    JSON, form or multipart body.
+    """
+    method: str
+    path: str
+    limit: int
+    window_seconds: float
+    key: str = "ip"  # "ip" or "email"
+    email_field: str = "email"
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path} per {self.key}"
+
+
+class RateLimitBackend(Protocol):
+    """
+    Store of token buckets. A shared implementation lets every worker
+    enforce one limit instead of one each.
+    """
+    async def take(self, rule: RateLimitRule, key: str) -> float:
+        """
+        Takes one token from the bucket for rule and key. Returns 0 if the
+        request is allowed, otherwise the seconds until a token is free.
+        """
+        ...
+
+
+class InMemoryRateLimitBackend:
+    """
+    Token buckets in process memory: one dict entry per key, updated in O(1).
+    Buckets idle for a whole window are full again, so they are simply
+    allowed to expire.
+    """
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: dict[RateLimitRule, TTLCache] = {}
+
+    async def take(self, rule: RateLimitRule, key: str) -> float:
+        buckets = self._buckets.get(rule)
+        if buckets is None:
+            buckets = self._buckets[rule] = TTLCache(max_entries=self.max_keys, ttl_seconds=rule.window_seconds)
+
+        now = time.monotonic()
+        refill_per_second = rule.limit / rule.window_seconds
+        tokens, updated_at = buckets.get(key) or (rule.limit, now)
+        tokens = min(rule.limit, tokens + (now - updated_at) * refill_per_second)
+        if tokens < 1:
+            buckets.set(key, (tokens, now))
+            return (1 - tokens) / refill_per_second
+        buckets.set(key, (tokens - 1, now))
+        return 0.0
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware that applies RateLimitRules before the request reaches
+    the route, so rejected requests never touch the database or the password
+    hasher. Rejections are 429 responses with Retry-After.
+
+    Routes limited per email must send a body the limiter can read: one
+    larger than _MAX_KEY_BODY_BYTES is rejected with 413 and one that cannot
+    be parsed with 400, rather than let through without the email limit.
+    """
+    def __init__(self, app, rules: list[RateLimitRule], backend: RateLimitBackend, prefix: str = ""):
+        self.app = app
+        self.backend = backend
+        self.rules: dict[tuple[str, str], list[RateLimitRule]] = {}
+        for rule in rules:
+            self.rules.setdefault((rule.method, prefix + rule.path), []).append(rule)
+
+    async def __call__(self, scope, receive, send):
+        rules = self.rules.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if not rules:
+            return await self.app(scope, receive, send)
+
+        form = None
+        if any(rule.key == "email" for rule in rules):
+            body, receive = await _buffer_body(scope, receive, _MAX_KEY_BODY_BYTES)
+            if body is None:
+                return await _error_response(send, 413, "Request body too large")
+            try:
+                form = await _parse_body(scope, body)
+            except ValueError:
+                return await _error_response(send, 400, "Malformed request body")
+
+        retry_after = 0.0
+        for rule in rules:
+            key = _client_ip(scope) if rule.key == "ip" else _email_from_form(form, rule.email_field)
+            if key is None:
+                continue
+            retry_after = max(retry_after, await self.backend.take(rule, key))
+
+        if retry_after > 0:
+            return await _too_many_requests(send, retry_after)
+        await self.app(scope, receive, send)
+
+
+def _client_ip(scope) -> str | None:
+    if settings.RATE_LIMIT_TRUST_FORWARDED_FOR:
+        forwarded_for = _header(scope, b"x-forwarded-for")
+        if forwarded_for is not None:
+            return forwarded_for.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+def _header(scope, name: bytes) -> str | None:
+    for header, value in scope.get("headers", []):
+        if header == name:
+            return value.decode("latin-1")
+    return None
+
+
+async def _buffer_body(scope, receive, max_bytes: int):
+    """
+    Reads the whole request body and returns it with a receive callable that
+    replays it to the application. The body is None, and left unread, once
+    its Content-Length or the bytes received exceed max_bytes.
+    """
+    content_length = _header(scope, b"content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+        return None, receive
+
+    chunks = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] != "http.request":
+            break
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > max_bytes:
+            return None, receive
+        chunks.append(chunk)
+        more_body = message.get("more_body", False)
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
+
+
+async def _parse_body(scope, body: bytes) -> dict:
+    """
+    Parses a JSON, form or multipart body into a dict of field values, or {}
+    for an empty body. Forms go through the same parsers as the routes, so
+    the key is the value the route sees, including which repeated field
+    wins. Raises ValueError for any other body.
+    """
+    if not body:
+        return {}
+    content_type = _header(scope, b"content-type") or ""
+    if content_type.startswith("application/json"):
+        data = json.loads(body)
+        if not isinstance(data, dict):
+            raise ValueError("JSON body is not an object")
+        return data
+    if content_type.startswith(("application/x-www-form-urlencoded", "multipart/form-data")):
+        async def stream():
+            yield body
+            yield b""
+
+        parser_class = FormParser if content_type.startswith("application/x-www-form-urlencoded") else MultiPartParser
+        try:
+            form = await parser_class(Headers(scope=scope), stream()).parse()
+        except MultiPartException as exc:
+            raise ValueError(exc.message) from exc
+        # Uploaded files are not email keys; close them before the body is replayed
+        await form.close()
+        return dict(form)
+    raise ValueError(f"Unsupported content type {content_type!r}")
+
+
+def _email_from_form(form: dict, field: str) -> str | None:
+    value = form.get(field)
+    return value.strip().lower() if isinstance(value, str) and value.strip() else None
+
+
+async def _error_response(send, status: int, detail: str, headers: list[tuple[bytes, bytes]] = ()):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *headers,
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _too_many_requests(send, retry_after: float):
+    await _error_response(
+        send, 429, "Too many requests, please retry later",
+        headers=[(b"retry-after", str(math.ceil(retry_after)).encode())],
+    )
+
+
+rate_limit_backend = InMemoryRateLimitBackend(max_keys=settings.RATE_LIMIT_MAX_KEYS)
@@ -0,0 +1,87 @@
+import time
+from datetime import datetime, timedelta
+from typing import Protocol
+from sqlmodel import select
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.db import async_session
+from app.models.security import RevokedAccessToken
+
+
+class RevocationBackend(Protocol):
+    """
+    Shared store of revoked access token ids that every worker syncs from.
+    """
+    async def add(self, jti: str, expires_at: datetime):
+        ...
+
+    async def revoked_since(self, since: datetime) -> list[tuple[str, datetime]]:
+        ...
+
+
+class DatabaseRevocationBackend:
+    """
+    Keeps revoked token ids in the revokedaccesstoken table.
+    """
+    async def add(self, jti: str, expires_at: datetime):
+        async with async_session() as session:
+            session.add(RevokedAccessToken(jti=jti, expires_at=expires_at))
+            await session.commit()
+
+    async def revoked_since(self, since: datetime) -> list[tuple[str, datetime]]:
+        async with async_session() as session:
+            result = await session.exec(
+                select(RevokedAccessToken.jti, RevokedAccessToken.expires_at)
+                .where(RevokedAccessToken.revoked_at >= since)
+                .where(RevokedAccessToken.expires_at > datetime.now())
+            )
+            return result.all()
+
+
+class RevocationStore:
+    """
+    In-process denylist of access token ids checked on every authenticated
+    request. Lookups are a single dict probe; the set is filled from the
+    shared backend by a background sync and pruned as tokens expire.
+    """
+    def __init__(self, backend: RevocationBackend):
+        self.backend = backend
+        self._revoked: dict[str, float] = {}  # jti -> expiry (epoch seconds)
+        self._synced_at: datetime | None = None
+        self.task = PeriodicTask(
+            name="revocation-sync",
+            interval_seconds=settings.REVOCATION_SYNC_SECONDS,
+            job=self.sync,
+        )
+
+    def is_revoked(self, jti: str | None) -> bool:
+        return jti is not None and jti in self._revoked
+
+    async def revoke(self, jti: str, expires_at: datetime):
+        """
+        Revokes a token in this process immediately and in the shared backend.
+        """
+        self._revoked[jti] = expires_at.timestamp()
+        await self.backend.add(jti, expires_at)
+
+    async def sync(self):
+        # Overlap the window slightly so rows committed during the last sync are not missed
+        since = self._synced_at - timedelta(seconds=1) if self._synced_at else datetime.min
+        self._synced_at = datetime.now()
+        for jti, expires_at in await self.backend.revoked_since(since):
+            self._revoked[jti] = expires_at.timestamp()
+        self._prune()
+
+    def _prune(self):
+        now = time.time()
+        for jti in [jti for jti, expires in self._revoked.items() if expires <= now]:
+            del self._revoked[jti]
+
+    def start(self):
+        self.task.start()
+
+    async def stop(self):
+        await self.task.stop()
+
+
+revocation_store = RevocationStore(backend=DatabaseRevocationBackend())
@@ -1,56 +1,212 @@
+import hashlib
+import logging
 import secrets
+import time
+import uuid
 from datetime import datetime, timedelta, timezone
 from sqlmodel import select, Session
+from sqlalchemy import delete, update
 from sqlmodel.ext.asyncio.session import AsyncSession
-from passlib.context import CryptContext
-from jose import jwt
 from app.core.config import settings
-from app.models.security import PasswordResetToken
+from app.core.tokens import TokenError, encode_token, sign_payload, verify_signed_payload
+from app.core.password_hasher import password_hasher
+from app.core.principal_cache import principal_cache
+from app.models.security import PasswordResetToken, RefreshToken
 from app.models.users import User
 
+logger = logging.getLogger(__name__)
 
-# Setup the bcrypt context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def hash_password(password: str) -> str:
+async def hash_password(password: str) -> str:
     """
-    Hashes a plain password using bcrypt."""
-    return pwd_context.hash(password)
+    Hashes a plain password using bcrypt on the hashing worker pool."""
+    return await password_hasher.hash(password)
+
+async def hash_passwords(passwords: list[str]) -> list[str]:
+    """
+    Hashes a batch of plain passwords in parallel on the hashing worker pool."""
+    return await password_hasher.hash_many(passwords)
 
 async def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    Verifies a plain password against a hashed password.
+    Verifies a plain password against a hashed password on the hashing worker pool.
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return await password_hasher.verify(plain_password, hashed_password)
 
 
 async def create_access_token(data: dict, expires_delta: timedelta | None = None):
     """
     Creates a JWT access token."""
     to_encode = data.copy()
-    expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    now = datetime.now(timezone.utc)
+    expire = now + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
+    to_encode.update({"exp": expire, "iat": now, "jti": uuid.uuid4().hex})
+    encoded_jwt = encode_token(to_encode)
     return encoded_jwt
 
 
+async def create_scoped_access_token(user: User, expires_delta: timedelta | None = None):
+    """
+    Creates a JWT access token that also carries the user id, account
+    memberships and token version, so read routes can authorize from the
+    claims alone. The user's accounts must be loaded.
+    """
+    return await create_access_token(
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "acc": [[account.id, account.account_unique_id] for account in user.accounts],
+            "tv": user.token_version,
+        },
+        expires_delta=expires_delta,
+    )
+
+
+def _hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+async def create_refresh_token(user_id: int, session: AsyncSession, family_id: str | None = None) -> str:
+    """
+    Issues a new opaque refresh token. Only its hash is stored.
+    """
+    token = secrets.token_urlsafe(32)
+    session.add(RefreshToken(
+        user_id=user_id,
+        token_hash=_hash_refresh_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        expires_at=datetime.now() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    await session.commit()
+    return token
+
+
+async def revoke_refresh_token_family(family_id: str, session: AsyncSession):
+    """
+    Revokes every refresh token issued from the same login.
+    """
+    await session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id)
+        .where(RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now())
+    )
+    await session.commit()
+
+
+async def get_refresh_token(token: str, session: AsyncSession) -> RefreshToken | None:
+    """
+    Retrieve a refresh token record by the raw token value.
+    """
+    result = await session.exec(
+        select(RefreshToken).where(RefreshToken.token_hash == _hash_refresh_token(token))
+    )
+    return result.first()
+
+
+async def rotate_refresh_token(token: str, session: AsyncSession) -> tuple[int, str] | None:
+    """
+    Exchanges a refresh token for a new one in the same family. Returns
+    (user_id, new_token), or None when the token is unknown, expired or
+    revoked. Presenting an already rotated token revokes the whole family,
+    since it means the token was copied.
+
+    The token is claimed with one conditional UPDATE, so of several
+    concurrent requests with the same token only one can succeed.
+    """
+    now = datetime.now()
+    token_hash = _hash_refresh_token(token)
+    result = await session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.token_hash == token_hash)
+        .where(RefreshToken.revoked_at.is_(None))
+        .where(RefreshToken.expires_at > now)
+        .values(revoked_at=now)
+        .returning(RefreshToken.user_id, RefreshToken.family_id)
+        .execution_options(synchronize_session=False)
+    )
+    claimed = result.first()
+    if claimed is None:
+        record = await get_refresh_token(token, session)
+        if record is not None and record.revoked_at is not None:
+            await revoke_refresh_token_family(record.family_id, session)
+        return None
+
+    user_id, family_id = claimed
+    new_token = await create_refresh_token(user_id, session, family_id=family_id)
+    return user_id, new_token
+
+
 async def create_password_reset_token(user_id: int, session) -> str:
     """
-    Creates a JWT token for password reset.
+    Creates a password reset token, replacing any the user already has so
+    each user holds at most one. Only flushes; the caller commits.
     """
     # 1. Generate a secure token
     token = secrets.token_urlsafe(32)
-    expires_at = datetime.now() + timedelta(hours=1) # Token valid for 1 hour
+    expires_at = datetime.now() + timedelta(minutes=settings.PASSWORD_RESET_TOKEN_EXPIRE_MINUTES)
 
-    # 2. Store the token in the database
+    # 2. Replace the user's previous token, so only the latest link works
+    await session.exec(
+        delete(PasswordResetToken)
+        .where(PasswordResetToken.user_id == user_id)
+        .execution_options(synchronize_session=False)
+    )
     password_reset_token = PasswordResetToken(user_id=user_id, token=token, expires_at=expires_at)
     session.add(password_reset_token)
-    await session.commit()
-    await session.refresh(password_reset_token)
+    await session.flush()
 
     return token
 
 
+def _password_fingerprint(password_hash: str) -> str:
+    return hashlib.sha256(password_hash.encode()).hexdigest()[:32]
+
+
+def create_signed_reset_token(user_id: int, password_hash: str) -> str:
+    """
+    Creates a stateless password reset token: a signed user id, expiry and
+    fingerprint of the current password hash. Nothing is stored; the token
+    stops working once the password changes, which makes it single use.
+    """
+    return sign_payload(
+        {
+            "uid": user_id,
+            "exp": int(time.time()) + settings.PASSWORD_RESET_TOKEN_EXPIRE_MINUTES * 60,
+            "fp": _password_fingerprint(password_hash),
+        },
+        purpose="password-reset",
+    )
+
+
+def read_signed_reset_token(token: str) -> dict | None:
+    """
+    Returns the claims of a signed reset token if its signature and expiry
+    are valid. Pure CPU; the password fingerprint is checked at reset time.
+    """
+    try:
+        return verify_signed_payload(token, purpose="password-reset")
+    except TokenError:
+        return None
+
+
+async def get_signed_reset_token_user(token: str, session: AsyncSession) -> tuple[int, str] | None:
+    """
+    Returns (user_id, password_hash) for the user a signed reset token was
+    issued to, or None if it is invalid, expired or the password has changed
+    since it was issued. Pass the hash on to update_user_password so the
+    token still matches when the password is written.
+    """
+    claims = read_signed_reset_token(token)
+    if claims is None:
+        return None
+    result = await session.exec(select(User.password).where(User.id == claims.get("uid")))
+    password_hash = result.first()
+    if password_hash is None or _password_fingerprint(password_hash) != claims.get("fp"):
+        return None
+    return claims["uid"], password_hash
+
+
 async def get_reset_token(token: str, session: Session):
     """
     Retrieve a password reset token record from the database.
@@ -62,29 +218,46 @@ async def get_reset_token(token: str, session: Session):
     return token_record
 
 
-async def update_user_password(user_id: int, password: str, session: AsyncSession):
+async def update_user_password(user_id: int, password: str, session: AsyncSession,
+                               current_password_hash: str | None = None) -> bool:
     """
-    Update user password in password reset process
+    Update user password in password reset process. Returns False if the
+    user does not exist or, given current_password_hash, their password is
+    no longer that hash.
+
+    The check and the write are one conditional UPDATE, so of several
+    concurrent resets against the same hash only one can succeed.
     """
-    statement = select(User).where(User.id == user_id)
-    result = await session.exec(statement)
-    user = result.first()
-    
-    if not user:
-        return {"error": "User not found"}
-    
-    user.password = hash_password(password)
-        
-    session.add(user)
+    password_hash = await hash_password(password)
+    statement = update(User).where(User.id == user_id)
+    if current_password_hash is not None:
+        statement = statement.where(User.password == current_password_hash)
+    result = await session.exec(
+        statement
+        .values(password=password_hash, token_version=User.token_version + 1)
+        .returning(User.email)
+        .execution_options(synchronize_session=False)
+    )
+    email = result.scalar_one_or_none()
+    if email is None:
+        await session.rollback()
+        return False
+
+    # Sign out every session that was opened with the old password
+    await session.exec(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id)
+        .where(RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now())
+    )
     await session.commit()
-    await session.refresh(user)
-    
-    return user
+    principal_cache.invalidate(email)
+    return True
 
 async def delete_reset_token(token_record: PasswordResetToken, session: AsyncSession):
     """
     Deletes a password reset token from the database.
     """
-    print(f"Deleting token: {token_record.token}")
+    logger.debug("Deleting password reset token %s", token_record.id)
     await session.delete(token_record)
     await session.commit()
\ No newline at end of file
@@ -0,0 +1,68 @@
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import delete
+from sqlmodel import select
+from app.core.background import PeriodicTask
+from app.core.config import settings
+from app.core.db import async_session
+from app.core.email_outbox import FAILED, SENT
+from app.models.email import EmailOutbox
+from app.models.security import PasswordResetToken, RefreshToken, RevokedAccessToken
+
+logger = logging.getLogger(__name__)
+
+
+class TokenPurger:
+    """
+    Deletes expired password reset tokens, refresh tokens and revoked access
+    token ids, and delivered or abandoned outbox emails (which contain reset
+    links) past their retention, in small batches, so the tables and their
+    indexes stay bounded without long-running deletes.
+    """
+    def __init__(self, batch_size: int, interval_seconds: float, outbox_retention: timedelta):
+        self.batch_size = batch_size
+        self.outbox_retention = outbox_retention
+        self.task = PeriodicTask(name="token-purge", interval_seconds=interval_seconds, job=self.purge)
+
+    async def purge(self) -> bool:
+        """
+        Deletes one batch of expired rows from each table. Returns True when
+        any batch was full and more expired rows are likely left.
+        """
+        now = datetime.now()
+        tables = (
+            (PasswordResetToken, PasswordResetToken.id, PasswordResetToken.expires_at < now),
+            (RefreshToken, RefreshToken.id, RefreshToken.expires_at < now),
+            (RevokedAccessToken, RevokedAccessToken.jti, RevokedAccessToken.expires_at < now),
+            (
+                EmailOutbox,
+                EmailOutbox.id,
+                EmailOutbox.status.in_((SENT, FAILED)) & (EmailOutbox.created_at < now - self.outbox_retention),
+            ),
+        )
+        more = False
+        async with async_session() as session:
+            for model, key, condition in tables:
+                expired = select(key).where(condition).limit(self.batch_size)
+                result = await session.exec(
+                    delete(model).where(key.in_(expired)).execution_options(synchronize_session=False)
+                )
+                # Commit per batch to keep locks short
+                await session.commit()
+                if result.rowcount:
+                    logger.info("Purged %s expired rows from %s", result.rowcount, model.__tablename__)
+                more = more or result.rowcount == self.batch_size
+        return more
+
+    def start(self):
+        self.task.start()
+
+    async def stop(self):
+        await self.task.stop()
+
+
+token_purger = TokenPurger(
+    batch_size=settings.TOKEN_PURGE_BATCH_SIZE,
+    interval_seconds=settings.TOKEN_PURGE_INTERVAL_SECONDS,
+    outbox_retention=timedelta(hours=settings.EMAIL_OUTBOX_RETENTION_HOURS),
+)
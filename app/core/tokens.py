@@ -0,0 +1,137 @@
+import base64
+import calendar
+import hashlib
+import hmac
+import json
+import time
+from datetime import datetime
+from functools import lru_cache
+from app.core.config import settings
+
+_HMAC_DIGESTS = {
+    "HS256": hashlib.sha256,
+    "HS384": hashlib.sha384,
+    "HS512": hashlib.sha512,
+}
+
+
+class TokenError(Exception):
+    """
+    Raised when a token is malformed, badly signed or expired.
+    """
+
+
+@lru_cache(maxsize=1)
+def _hmac_key() -> bytes:
+    # Built once per process instead of once per request
+    return settings.SECRET_KEY.encode()
+
+
+@lru_cache(maxsize=None)
+def _purpose_key(purpose: str) -> bytes:
+    # Separate key per purpose, so a signed payload for one use is never valid for another
+    return hmac.new(_hmac_key(), purpose.encode(), hashlib.sha256).digest()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _decode_hmac(token: str, algorithm: str) -> dict:
+    try:
+        signing_input, _, signature = token.rpartition(".")
+        header_segment, _, payload_segment = signing_input.partition(".")
+        header = json.loads(_b64decode(header_segment))
+        if header.get("alg") != algorithm:
+            raise TokenError("Unexpected token algorithm")
+        expected = hmac.new(_hmac_key(), signing_input.encode(), _HMAC_DIGESTS[algorithm]).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            raise TokenError("Invalid token signature")
+        claims = json.loads(_b64decode(payload_segment))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise TokenError("Malformed token") from e
+    if not isinstance(claims, dict):
+        raise TokenError("Malformed token")
+    exp = claims.get("exp")
+    if exp is not None and time.time() >= exp:
+        raise TokenError("Token has expired")
+    return claims
+
+
+def decode_token(token: str) -> dict:
+    """
+    Verifies a JWT signed with SECRET_KEY and returns its claims.
+
+    HMAC algorithms are verified directly with the cached key, which skips
+    python-jose's per-call key construction and claim machinery; any other
+    algorithm falls back to python-jose.
+    """
+    algorithm = settings.ALGORITHM
+    if algorithm in _HMAC_DIGESTS:
+        return _decode_hmac(token, algorithm)
+    from jose import jwt, JWTError
+    try:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[algorithm])
+    except JWTError as e:
+        raise TokenError(str(e)) from e
+
+
+def sign_payload(claims: dict, purpose: str) -> str:
+    """
+    Signs claims with an HMAC-SHA256 key derived from SECRET_KEY for the
+    given purpose. The result is compact and URL safe, but is not a JWT.
+    """
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signature = hmac.new(_purpose_key(purpose), payload.encode(), hashlib.sha256).digest()
+    return f"{payload}.{_b64encode(signature)}"
+
+
+def verify_signed_payload(token: str, purpose: str) -> dict:
+    """
+    Verifies a payload from sign_payload for the same purpose and returns its
+    claims, checking the exp claim if present.
+    """
+    try:
+        payload, _, signature = token.partition(".")
+        expected = hmac.new(_purpose_key(purpose), payload.encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            raise TokenError("Invalid token signature")
+        claims = json.loads(_b64decode(payload))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise TokenError("Malformed token") from e
+    if not isinstance(claims, dict):
+        raise TokenError("Malformed token")
+    exp = claims.get("exp")
+    if exp is not None and time.time() >= exp:
+        raise TokenError("Token has expired")
+    return claims
+
+
+def _encode_hmac(claims: dict, algorithm: str) -> str:
+    claims = {
+        # Same NumericDate conversion python-jose applies
+        name: calendar.timegm(value.utctimetuple()) if isinstance(value, datetime) else value
+        for name, value in claims.items()
+    }
+    header = _b64encode(json.dumps({"alg": algorithm, "typ": "JWT"}, separators=(",", ":")).encode())
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    signing_input = f"{header}.{payload}"
+    signature = hmac.new(_hmac_key(), signing_input.encode(), _HMAC_DIGESTS[algorithm]).digest()
+    return f"{signing_input}.{_b64encode(signature)}"
+
+
+def encode_token(claims: dict) -> str:
+    """
+    Signs claims as a JWT with SECRET_KEY. HMAC algorithms are signed
+    directly; python-jose, and the cryptography stack behind it, is only
+    imported for other algorithms.
+    """
+    algorithm = settings.ALGORITHM
+    if algorithm in _HMAC_DIGESTS:
+        return _encode_hmac(claims, algorithm)
+    from jose import jwt
+    return jwt.encode(claims, settings.SECRET_KEY, algorithm=algorithm)
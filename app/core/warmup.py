@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel import select
+from app.core.config import settings
+from app.core.db import async_engine, async_read_session, async_session, replica_set
+from app.core.password_hasher import password_hasher
+from app.models.users import User
+
+logger = logging.getLogger(__name__)
+
+
+async def _open_pool(engine: AsyncEngine):
+    # Hold pool-size connections at once so the pool really opens that many
+    async with AsyncExitStack() as stack:
+        for _ in range(engine.sync_engine.pool.size()):
+            conn = await stack.enter_async_context(engine.connect())
+            await conn.execute(text("SELECT 1"))
+
+
+async def _run_hot_queries(session):
+    # Lookups for ids and keys that never exist: only statement compilation
+    # (and the engine's compiled cache) is the point here
+    from app.utils import accounts as account_utils
+    from app.utils import users as user_utils
+    from app.utils.auth import _principal_statement
+
+    # The principal query itself, not _load_principal, so warm-up adds no
+    # misses to the principal cache stats
+    await session.exec(_principal_statement(""))
+    await session.exec(select(User.token_version).where(User.id == 0))
+    await user_utils.get_users_for_account(account_id=0, session=session, limit=1)
+    await user_utils.get_user_basic_by_id(0, session)
+    await user_utils.get_user_by_email("", session)
+    await user_utils.get_user_credentials_by_email("", session)
+    await user_utils.get_user_with_accounts_by_id(0, session)
+    await account_utils.get_account_read_by_account_unique_id("", session)
+    await account_utils.get_account_by_account_unique_id("", session)
+    await account_utils.get_account_version("", session)
+    await account_utils.get_accounts_for_user(0, session)
+
+
+def _exercise_serializers():
+    from app.main import app
+    from app.schemas.accounts import account_list_adapter
+    from app.schemas.users import UserRead, user_list_adapter
+
+    account = {"id": 0, "account_organisation": "", "account_unique_id": ""}
+    user = {"id": 0, "email": "", "full_name": None}
+    account_list_adapter.dump_json(account_list_adapter.validate_python([account]))
+    user_list_adapter.dump_json(user_list_adapter.validate_python([user]))
+    UserRead.model_validate({**user, "accounts": [account]}).model_dump_json()
+    app.openapi()
+
+
+class WarmUp:
+    """
+    Prepares a fresh worker before it reports ready: opens the connection
+    pools, compiles the hot queries, runs the response serializers once and
+    starts every password hashing worker. Runs in the background so /health
+    answers meanwhile; /ready stays 503 until it has finished.
+    """
+    def __init__(self, enabled: bool, retry_seconds: float):
+        self.enabled = enabled
+        self.retry_seconds = retry_seconds
+        self.ready = not enabled
+        self.duration_seconds: float | None = None
+        self._task: asyncio.Task | None = None
+
+    async def run(self):
+        started = time.perf_counter()
+        await asyncio.gather(_open_pool(async_engine), *(_open_pool(e) for e in replica_set.engines))
+        async with async_session() as session:
+            await _run_hot_queries(session)
+        async with async_read_session() as session:
+            await _run_hot_queries(session)
+        _exercise_serializers()
+        await password_hasher.hash_many(["warm-up"] * password_hasher.max_workers)
+        self.duration_seconds = time.perf_counter() - started
+        self.ready = True
+        logger.info("Warm-up finished in %.2fs", self.duration_seconds)
+
+    async def _run_until_done(self):
+        while not self.ready:
+            try:
+                await self.run()
+            except Exception:
+                logger.exception("Warm-up failed, retrying in %ss", self.retry_seconds)
+                await asyncio.sleep(self.retry_seconds)
+
+    def start(self):
+        if not self.ready and self._task is None:
+            self._task = asyncio.create_task(self._run_until_done(), name="warm-up")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+warm_up = WarmUp(enabled=settings.WARMUP_ENABLED, retry_seconds=settings.WARMUP_RETRY_SECONDS)
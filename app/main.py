@@ -1,10 +1,29 @@
+import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlmodel import SQLModel
-from app.api.v1.routes import router as api_v1_router
+from app.api.v1.routes import admission_groups, admission_unsampled_paths, rate_limit_rules, router as api_v1_router
+from app.core.admission import AdmissionMiddleware
+from app.core.account_cache import account_cache
 from app.core.config import settings
-from app.core.db import async_engine
+from app.core.db import async_engine, pool_status, replica_set
+from app.core.email_outbox import email_dispatcher
+from app.core.instrumentation import RequestTimingMiddleware, install_sql_hooks
+from app.core.password_hasher import PasswordHasherBusy, password_hasher
+from app.core.principal_cache import principal_cache
+from app.core.rate_limit import RateLimitMiddleware, rate_limit_backend
+from app.core.revocation import revocation_store
+from app.core.token_purge import token_purger
+from app.core.warmup import warm_up
+logging.basicConfig(
+    level=settings.LOG_LEVEL,
+    format="%(asctime)s %(levelname)s %(name)s %(message)s",
+)
+install_sql_hooks(async_engine)
+for replica_engine in replica_set.engines:
+    install_sql_hooks(replica_engine)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -13,10 +32,41 @@ async def lifespan(app: FastAPI):
         # async with async_engine.begin() as conn:
         #     await conn.run_sync(SQLModel.metadata.create_all)
         pass
+    if settings.EMAIL_OUTBOX_ENABLED:
+        email_dispatcher.start()
+    revocation_store.start()
+    replica_set.start()
+    token_purger.start()
+    warm_up.start()
     yield
+    # Shutdown: stop background workers
+    await warm_up.stop()
+    await token_purger.stop()
+    await replica_set.stop()
+    await revocation_store.stop()
+    await email_dispatcher.stop()
+    password_hasher.shutdown()
 
 app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
+# Inside the rate limiter, so rate-limited requests never take a slot
+if settings.ADMISSION_CONTROL_ENABLED:
+    app.add_middleware(
+        AdmissionMiddleware,
+        groups=admission_groups,
+        prefix=settings.API_V1_PREFIX,
+        unsampled_paths=admission_unsampled_paths,
+    )
+
+# Inside CORS, so 429 responses still carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        rules=rate_limit_rules,
+        backend=rate_limit_backend,
+        prefix=settings.API_V1_PREFIX,
+    )
+
 # Allow frontend to talk to backend
 app.add_middleware(
     CORSMiddleware,
@@ -26,8 +76,45 @@ app.add_middleware(
     allow_headers=["*"],  # allow Authorization, Content-Type, etc.
 )
 
+# Outermost, so its timings cover every other middleware
+app.add_middleware(RequestTimingMiddleware)
+
 app.include_router(api_v1_router, prefix=settings.API_V1_PREFIX)
 
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    # Shed load instead of queueing more bcrypt work behind a saturated pool
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 @app.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    # Route traffic here only once the warm-up has run; /health is liveness only
+    if not warm_up.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "warming_up"},
+            headers={"Retry-After": "1"},
+        )
+    return {"status": "ready", "warmup_seconds": warm_up.duration_seconds}
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "principal_cache": principal_cache.stats(),
+        "account_cache": account_cache.stats(),
+        "db_pool": pool_status(async_engine),
+        "db_replicas": replica_set.status(),
+        "admission": {name: group.stats() for name, group in admission_groups.items()},
+    }
+
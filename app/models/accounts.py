@@ -15,6 +15,7 @@ class Account(AccountBase, table=True):
     Account model representing an account entity.
     """
     id: Optional[int] = Field(default=None, primary_key=True)
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # bumped on every change; backs ETags
     users: List["User"] = Relationship(
         back_populates="accounts",
         link_model=UserAccountLink  # reference the association table
@@ -21,6 +21,7 @@ class UserAccountLink(SQLModel, table=True):
         sa_column=sa.Column(
             sa.Integer,
             ForeignKey("account.id"),
-            primary_key=True
+            primary_key=True,
+            index=True  # the composite PK leads with user_id
         )
     )
@@ -0,0 +1,26 @@
+from typing import Optional
+from datetime import datetime
+from sqlmodel import SQLModel, Field
+
+
+class EmailOutboxBase(SQLModel):
+    """
+    Base model for an outgoing email waiting to be delivered.
+    """
+    to_email: str
+    subject: str
+    text_body: str
+    html_body: str
+
+class EmailOutbox(EmailOutboxBase, table=True):
+    """
+    Outbox row written by request handlers and drained by the email dispatcher.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    status: str = Field(default="pending", index=True)  # pending, sending, sent or failed
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.now, index=True)
+    last_error: Optional[str] = None
+    provider_message_id: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    sent_at: Optional[datetime] = None
@@ -10,7 +10,34 @@ class PasswordResetToken(PasswordResetTokenBase, table=True):
 
     user_id: int = Field(foreign_key="user.id", index=True, nullable=False)
     token: str = Field(unique=True,  index=True, nullable=False)
-    expires_at: Optional[datetime] = Field(default=None)
+    expires_at: Optional[datetime] = Field(default=None, index=True)
 
     def is_expired(self):
-        return datetime.now() > self.expires_at
\ No newline at end of file
+        return datetime.now() > self.expires_at
+
+
+class RefreshToken(SQLModel, table=True):
+    """
+    Rotating refresh token. Only a SHA-256 hash of the token is stored; all
+    tokens issued from one login share a family_id so reuse of a rotated
+    token can revoke the whole chain.
+    """
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id", ondelete="CASCADE", index=True, nullable=False)
+    token_hash: str = Field(unique=True, index=True, nullable=False)
+    family_id: str = Field(index=True, nullable=False)
+    expires_at: datetime = Field(index=True, nullable=False)
+    revoked_at: Optional[datetime] = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    def is_expired(self):
+        return datetime.now() > self.expires_at
+
+
+class RevokedAccessToken(SQLModel, table=True):
+    """
+    Denylisted access token id (jti), kept until the token would have expired.
+    """
+    jti: str = Field(primary_key=True)
+    expires_at: datetime = Field(index=True, nullable=False)
+    revoked_at: datetime = Field(default_factory=datetime.now, index=True)
@@ -6,7 +6,7 @@ class UserBase(SQLModel):
     """
     Base model for User with common fields.
     """
-    email: str
+    email: str = Field(unique=True, index=True)
     password: str
     full_name: Optional[str] = None
 
@@ -15,7 +15,10 @@ class User(UserBase, table=True):
     User model representing a user entity.
     """
     id: Optional[int] = Field(default=None, primary_key=True)
+    token_version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # bumped to invalidate scoped tokens
+    version: int = Field(default=0, sa_column_kwargs={"server_default": "0"})  # bumped when the user or its memberships change; backs ETags
     accounts: List["Account"] = Relationship(
         back_populates="users",
         link_model=UserAccountLink,
     )
+
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from typing import List, Optional
 
 class AccountCreate(BaseModel):
@@ -11,12 +11,14 @@ class AccountRead(BaseModel):
     """
     Schema for reading account details.
     """
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     account_organisation: str
     account_unique_id: str
 
-    class Config:
-        orm_mode = True
+# Built once at import; list routes serialize through it directly
+account_list_adapter = TypeAdapter(List[AccountRead])
 
 class AccountReadWithUsers(AccountRead):
     """
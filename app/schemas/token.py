@@ -2,9 +2,16 @@ from pydantic import BaseModel
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: str | None = None
     token_type: str = "bearer"
     account_unique_id: str | None = None
     account_organisation: str | None = None
 
 class TokenData(BaseModel):
     email: str | None = None
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = None
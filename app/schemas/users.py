@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 from typing import List, Optional
 from app.schemas.accounts import AccountRead
 
@@ -15,15 +15,14 @@ class UserReadBasic(BaseModel):
     """
     Basic schema for reading user details.
     """
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     email: str
     full_name: Optional[str] = None
 
-    class Config:
-        """
-        Enable ORM mode for compatibility with ORM objects.
-        """
-        orm_mode = True
+# Built once at import; list routes serialize through it directly
+user_list_adapter = TypeAdapter(List[UserReadBasic])
 
 class UserRead(UserReadBasic):
     """
@@ -55,4 +54,50 @@ class MessageResponse(BaseModel):
     """
     Generic message response schema.
     """
-    message: str
\ No newline at end of file
+    message: str
+
+
+class UserBulkItem(BaseModel):
+    """
+    Schema for one user in a bulk provisioning request.
+    """
+    email: str
+    password: Optional[str] = None
+    full_name: Optional[str] = None
+
+class UserBulkResult(BaseModel):
+    """
+    Outcome for one row of a bulk provisioning request.
+    """
+    row: int
+    email: Optional[str] = None
+    status: str  # "created", "linked", "unchanged" or "failed"
+    user_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class UserBulkReport(BaseModel):
+    """
+    Summary and per-row results of a bulk provisioning request.
+    """
+    created: int = 0
+    linked: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    results: List[UserBulkResult] = []
+
+
+class MembershipDiff(BaseModel):
+    """
+    Account memberships to add and remove for one or more users.
+    """
+    user_ids: List[int]
+    add_account_ids: List[int] = []
+    remove_account_ids: List[int] = []
+
+class MembershipDiffResult(BaseModel):
+    """
+    Number of memberships added and removed, and of users affected.
+    """
+    memberships_added: int
+    memberships_removed: int
+    users_changed: int
@@ -2,19 +2,32 @@ from secrets import token_hex
 from sqlmodel import Session
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.expression import select
+from sqlalchemy import delete, exists, update
+from sqlalchemy.orm import aliased
 from app.models.accounts import Account
+from app.models.associations import UserAccountLink
+from app.models.security import PasswordResetToken, RefreshToken
+from app.models.users import User
+from app.core.account_cache import CachedAccount, account_cache
+from app.core.db import after_commit
+from app.core.principal_cache import principal_cache
+
+# Columns behind AccountRead, plus the version its ETag is derived from
+ACCOUNT_READ_COLUMNS = (Account.id, Account.account_organisation, Account.account_unique_id, Account.version)
+
 
 async def create_new_account_in_db(account_organisation: str, session: AsyncSession):
     """
-    Generates a new account with a unique account ID and saves it to the database.
+    Generates a new account with a unique account ID and flushes it so its id
+    is available to the rest of the caller's transaction.
     """
     account_unique_id = token_hex(8)
     account = Account(account_organisation=account_organisation,
                       account_unique_id=account_unique_id)
     session.add(account)
-    await session.commit()
-    await session.refresh(account)
-    
+    await session.flush()
+    after_commit(session, account_cache.invalidate, account_unique_id)
+
     return account
 
 
@@ -29,13 +42,145 @@ async def get_account_by_account_unique_id(account_unique_id: str,session: Async
     return account
 
 
+async def get_account_read_by_account_unique_id(account_unique_id: str, session: AsyncSession):
+    """
+    Retrieves an (id, account_organisation, account_unique_id) row for read
+    routes, without adding an Account entity to the session.
+    """
+    statement = select(*ACCOUNT_READ_COLUMNS).where(Account.account_unique_id == account_unique_id)
+    result = await session.exec(statement)
+    return result.first()
+
+
+async def get_account_version(account_unique_id: str, session: AsyncSession) -> int | None:
+    """
+    Retrieves only the account's version, for answering conditional requests.
+    """
+    result = await session.exec(select(Account.version).where(Account.account_unique_id == account_unique_id))
+    return result.first()
+
+
+async def get_accounts_for_user(user_id: int, session: AsyncSession, columns=ACCOUNT_READ_COLUMNS):
+    """
+    Retrieves rows of the given columns for every account a user belongs to,
+    ordered by id.
+    """
+    statement = (
+        select(*columns)
+        .join(UserAccountLink, UserAccountLink.account_id == Account.id)
+        .where(UserAccountLink.user_id == user_id)
+        .order_by(Account.id)
+    )
+    result = await session.exec(statement)
+    return result.all()
+
+
+async def get_cached_account(
+        account_unique_id: str,
+        session: AsyncSession,
+        version: int | None = None) -> CachedAccount | None:
+    """
+    Retrieves an account's columns through the account cache, querying only
+    on a miss. Pass a version just read from the database to skip a cached
+    entry older than it.
+    """
+    account = await account_cache.get(account_unique_id)
+    if account is not None and version is not None and account.version < version:
+        account = None
+    if account is None:
+        version = account_cache.version(account_unique_id)
+        row = await get_account_read_by_account_unique_id(account_unique_id, session)
+        if row is None:
+            return None
+        account = CachedAccount(*row)
+        await account_cache.set(account_unique_id, account, version)
+    return account
+
+
+async def get_account_id_by_account_unique_id(account_unique_id: str, session: AsyncSession) -> int | None:
+    """
+    Resolves an account_unique_id to the account's integer id through the
+    account cache. For read routes only: invalidations reach just the worker
+    that made the write, so write routes query the primary instead.
+    """
+    account = await get_cached_account(account_unique_id, session)
+    return account.id if account else None
+
+
 async def update_account(account: Account, account_organisation: str, session: AsyncSession):
     """
     Updates the account's organisation name.
     """
     account.account_organisation = account_organisation
+    account.version += 1
     session.add(account)
-    await session.commit()
-    await session.refresh(account)
+    await session.flush()
+    # Cached principals hold account ids only, so the rename leaves them valid
+    after_commit(session, account_cache.invalidate, account.account_unique_id)
     return account
 
+
+async def delete_account_and_orphaned_users(account_id: int, session: AsyncSession) -> dict:
+    """
+    Deletes an account, its memberships and every user who belonged to no
+    other account, using set-based statements in the caller's transaction.
+    Returns the number of rows deleted per table.
+    """
+    other_link = aliased(UserAccountLink)
+    orphaned_user_ids = (
+        select(UserAccountLink.user_id)
+        .where(UserAccountLink.account_id == account_id)
+        .where(
+            ~exists()
+            .where(other_link.user_id == UserAccountLink.user_id)
+            .where(other_link.account_id != account_id)
+        )
+    )
+    no_sync = {"synchronize_session": False}
+
+    # Every member loses this account from their scoped tokens and cached
+    # principal. One link per member, so this also counts the memberships
+    # before any are deleted: where links cascade with their users, the
+    # link DELETE below misses the orphans' links
+    members = await session.exec(
+        update(User)
+        .where(User.id.in_(select(UserAccountLink.user_id).where(UserAccountLink.account_id == account_id)))
+        .values(token_version=User.token_version + 1, version=User.version + 1)
+        .returning(User.email)
+        .execution_options(**no_sync)
+    )
+    member_emails = members.scalars().all()
+    tokens = await session.exec(
+        delete(PasswordResetToken)
+        .where(PasswordResetToken.user_id.in_(orphaned_user_ids))
+        .execution_options(**no_sync)
+    )
+    refresh_tokens = await session.exec(
+        delete(RefreshToken)
+        .where(RefreshToken.user_id.in_(orphaned_user_ids))
+        .execution_options(**no_sync)
+    )
+    # Users go first: the orphan subquery reads the links deleted below
+    users = await session.exec(
+        delete(User).where(User.id.in_(orphaned_user_ids)).execution_options(**no_sync)
+    )
+    await session.exec(
+        delete(UserAccountLink).where(UserAccountLink.account_id == account_id).execution_options(**no_sync)
+    )
+    accounts = await session.exec(
+        delete(Account)
+        .where(Account.id == account_id)
+        .returning(Account.account_unique_id)
+        .execution_options(**no_sync)
+    )
+    deleted_unique_ids = accounts.scalars().all()
+    after_commit(session, principal_cache.invalidate, *member_emails)
+    after_commit(session, account_cache.invalidate, *deleted_unique_ids)
+
+    return {
+        "accounts_deleted": len(deleted_unique_ids),
+        "users_deleted": users.rowcount,
+        "memberships_deleted": len(member_emails),
+        "reset_tokens_deleted": tokens.rowcount,
+        "refresh_tokens_deleted": refresh_tokens.rowcount,
+    }
@@ -1,34 +1,135 @@
+import time
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlmodel import Session, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy.orm import selectinload
-from jose import jwt, JWTError
 from app.models.users import User
-from app.core.db import get_session
+from app.core.db import get_read_session, get_session
 from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.principal_cache import principal_cache
+from app.core.revocation import revocation_store
+from app.core.tokens import TokenError, decode_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
-async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)) -> User:
+# user id -> token version last confirmed against the database
+_verified_token_versions = TTLCache(
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.TOKEN_VERSION_CACHE_SECONDS,
+)
+
+
+@dataclass(frozen=True)
+class Principal:
     """
-    Decode the JWT token and retrieve the current user."""
-    credentials_exception = HTTPException(
+    The authenticated caller, as needed by routes that only check identity
+    and account membership. Immutable, so it can be cached and shared
+    across requests.
+    """
+    user_id: int
+    email: str
+    token_version: int
+    account_ids: tuple[int, ...]
+    account_unique_ids: tuple[str, ...]
+
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def _decode_claims(token: str) -> dict:
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-
-    statement = select(User).options(selectinload(User.accounts)).where(User.email == email)
-    result = await session.exec(statement)
+        payload = decode_token(token)
+    except TokenError:
+        raise _credentials_exception()
+    if payload.get("sub") is None or revocation_store.is_revoked(payload.get("jti")):
+        raise _credentials_exception()
+    return payload
+
+
+def _principal_statement(email: str):
+    return select(User).options(selectinload(User.accounts)).where(User.email == email)
+
+
+async def _load_principal(email: str, session: AsyncSession) -> Principal | None:
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    version = principal_cache.version(email)
+    result = await session.exec(_principal_statement(email))
     user = result.first()
     if user is None:
-        raise credentials_exception
-    return user
\ No newline at end of file
+        return None
+    # Cache a snapshot, never the ORM object: it belongs to this request's session
+    principal = Principal(
+        user_id=user.id,
+        email=user.email,
+        token_version=user.token_version,
+        account_ids=tuple(account.id for account in user.accounts),
+        account_unique_ids=tuple(account.account_unique_id for account in user.accounts),
+    )
+    principal_cache.set(email, principal, version)
+    return principal
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_session)) -> Principal:
+    """
+    Decode the JWT token and resolve the current user, checking the token
+    version of scoped tokens on every request."""
+    payload = _decode_claims(token)
+    principal = await _load_principal(payload["sub"], session)
+    if principal is None:
+        raise _credentials_exception()
+    if "tv" in payload and payload["tv"] != principal.token_version:
+        raise _credentials_exception()
+    return principal
+
+
+async def get_current_principal(token: str = Depends(oauth2_scheme), session: AsyncSession = Depends(get_read_session)) -> Principal:
+    """
+    Resolve the caller for read routes. Scoped tokens are trusted from their
+    signed claims, and only re-check the user's token version once they are
+    older than TOKEN_REVALIDATE_SECONDS, at most once per
+    TOKEN_VERSION_CACHE_SECONDS per user and worker; legacy tokens load the
+    user.
+    """
+    payload = _decode_claims(token)
+
+    if "uid" not in payload:
+        principal = await _load_principal(payload["sub"], session)
+        if principal is None:
+            raise _credentials_exception()
+        return principal
+
+    if time.time() - payload.get("iat", 0) > settings.TOKEN_REVALIDATE_SECONDS:
+        if _verified_token_versions.get(payload["uid"]) != payload.get("tv"):
+            result = await session.exec(select(User.token_version).where(User.id == payload["uid"]))
+            if result.first() != payload.get("tv"):
+                raise _credentials_exception()
+            _verified_token_versions.set(payload["uid"], payload["tv"])
+
+    memberships = payload.get("acc", [])
+    return Principal(
+        user_id=payload["uid"],
+        email=payload["sub"],
+        token_version=payload.get("tv"),
+        account_ids=tuple(account_id for account_id, _ in memberships),
+        account_unique_ids=tuple(unique_id for _, unique_id in memberships),
+    )
+
+
+def require_account_member(principal: Principal, account_unique_id: str):
+    """
+    Rejects callers who do not belong to the account. Uses the principal's
+    memberships, so scoped tokens are authorized without a query.
+    """
+    if account_unique_id not in principal.account_unique_ids:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not a member of this account")
@@ -1,11 +1,28 @@
 from sqlmodel import Session
 from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlmodel.sql.expression import select
+from sqlalchemy import delete, func, insert, true, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
+from app.core.config import settings
+from app.core.db import after_commit
+from app.core.security import hash_passwords
 from app.models.users import User
 from app.models.accounts import Account
 from app.models.associations import UserAccountLink
+from app.models.security import PasswordResetToken, RefreshToken
+from app.core.principal_cache import principal_cache
+from app.schemas.users import UserBulkItem, UserBulkReport, UserBulkResult
+
+# Columns behind UserReadBasic; read routes select these instead of the entity
+USER_BASIC_COLUMNS = (User.id, User.email, User.full_name)
+# What list ETags are derived from
+USER_VERSION_COLUMNS = (User.id, User.version)
+
+# INSERT constructs that support ON CONFLICT DO NOTHING, by dialect name
+_INSERT_IGNORE = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
 
 
 async def create_new_user_in_db(
@@ -13,70 +30,304 @@ async def create_new_user_in_db(
         password: str,
         full_name: str,
         account_ids: Optional[List[int]],
-        session: AsyncSession):
+        session: AsyncSession,
+        accounts: Optional[List[Account]] = None):
     """
-    Creates a new user and assigns it to multiple accounts.
+    Creates a new user and assigns it to multiple accounts. Pass accounts
+    already loaded in this session instead of account_ids to skip the lookup.
+    Only flushes; the caller commits.
     """
     user = User(email=email, password=password, full_name=full_name)
-    
-    if account_ids:
+    user.accounts = list(accounts or [])
+
+    if account_ids and not accounts:
         # fetch accounts from DB
         accounts = await session.exec(select(Account).where(Account.id.in_(account_ids)))
         user.accounts = accounts.all()
 
+    # The INSERT returns the generated id, and accounts stay loaded for the response
     session.add(user)
-    await session.commit()
-    await session.refresh(user)
+    await session.flush()
     return user
 
 
-async def add_user_to_accounts(user: User, account_ids: list[int], session: AsyncSession):
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+async def bulk_create_users_for_account(
+        account_id: int,
+        items: List[UserBulkItem],
+        session: AsyncSession) -> UserBulkReport:
+    """
+    Creates or links many users to one account. Existing emails are resolved
+    with set lookups, new passwords are hashed in parallel and User /
+    UserAccountLink rows are written with multi-row inserts. The lookup
+    transaction is committed before hashing; the writes run in a new
+    transaction that the caller commits.
+    """
+    chunk_size = settings.BULK_USERS_CHUNK_SIZE
+    results: List[Optional[UserBulkResult]] = [None] * len(items)
+
+    # 1. Reject rows without an email or repeating one already seen in this request
+    first_row_for_email: dict[str, int] = {}
+    for row, item in enumerate(items):
+        if not item.email:
+            results[row] = UserBulkResult(row=row, status="failed", detail="Email is required")
+        elif item.email in first_row_for_email:
+            results[row] = UserBulkResult(row=row, email=item.email, status="failed",
+                                          detail="Duplicate email in request")
+        else:
+            first_row_for_email[item.email] = row
+
+    # 2. Resolve which emails already exist, and which of those are already members
+    existing_ids: dict[str, int] = {}
+    for emails in _chunks(list(first_row_for_email), chunk_size):
+        rows = await session.exec(select(User.id, User.email).where(User.email.in_(emails)))
+        existing_ids.update({email: user_id for user_id, email in rows.all()})
+
+    member_ids: set[int] = set()
+    for user_ids in _chunks(list(existing_ids.values()), chunk_size):
+        rows = await session.exec(
+            select(UserAccountLink.user_id)
+            .where(UserAccountLink.account_id == account_id)
+            .where(UserAccountLink.user_id.in_(user_ids))
+        )
+        member_ids.update(rows.all())
+
+    links: list[dict] = []
+    new_rows: list[int] = []
+    for email, row in first_row_for_email.items():
+        user_id = existing_ids.get(email)
+        if user_id is None:
+            if not items[row].password:
+                results[row] = UserBulkResult(row=row, email=email, status="failed",
+                                              detail="Password is required for new users")
+            else:
+                new_rows.append(row)
+        elif user_id in member_ids:
+            results[row] = UserBulkResult(row=row, email=email, status="unchanged", user_id=user_id)
+        else:
+            links.append({"user_id": user_id, "account_id": account_id})
+            results[row] = UserBulkResult(row=row, email=email, status="linked", user_id=user_id)
+
+    # 3. Hash new passwords in parallel and insert the new users. Nothing is
+    # written yet, so end the read transaction first: hashing thousands of
+    # passwords must not keep a pooled connection idle in a transaction
+    await session.commit()
+    hashes = await hash_passwords([items[row].password for row in new_rows])
+    for rows in _chunks(list(zip(new_rows, hashes)), chunk_size):
+        values = [
+            {"email": items[row].email, "password": password, "full_name": items[row].full_name}
+            for row, password in rows
+        ]
+        inserted = await session.exec(insert(User).returning(User.id, User.email), params=values)
+        created_ids = {email: user_id for user_id, email in inserted.all()}
+        for row, _ in rows:
+            user_id = created_ids[items[row].email]
+            links.append({"user_id": user_id, "account_id": account_id})
+            results[row] = UserBulkResult(row=row, email=items[row].email, status="created", user_id=user_id)
+
+    # 4. Link everyone to the account. The lookup transaction ended before
+    # hashing, so skip links another request has created since
+    insert_ignore = _INSERT_IGNORE[session.get_bind().dialect.name]
+    for values in _chunks(links, chunk_size):
+        await session.exec(insert_ignore(UserAccountLink).on_conflict_do_nothing(), params=values)
+
+    # Existing users gained a membership, so their scoped tokens are stale
+    linked_ids = [result.user_id for result in results if result.status == "linked"]
+    for user_ids in _chunks(linked_ids, chunk_size):
+        await session.exec(
+            update(User)
+            .where(User.id.in_(user_ids))
+            .values(token_version=User.token_version + 1, version=User.version + 1)
+            .execution_options(synchronize_session=False)
+        )
+
+    after_commit(session, principal_cache.invalidate,
+                 *(result.email for result in results if result.status == "linked"))
+
+    report = UserBulkReport(results=results)
+    for result in results:
+        setattr(report, result.status, getattr(report, result.status) + 1)
+    return report
+
+
+async def add_memberships(user_ids: List[int], account_ids: List[int], session: AsyncSession) -> List[int]:
+    """
+    Links every given user to every given account with one INSERT ... SELECT
+    that skips existing links and ids that do not exist. Returns the user id
+    of each link created.
+    """
+    insert_ignore = _INSERT_IGNORE[session.get_bind().dialect.name]
+    pairs = (
+        select(User.id, Account.id)
+        .join(Account, true())
+        .where(User.id.in_(user_ids))
+        .where(Account.id.in_(account_ids))
+    )
+    statement = (
+        insert_ignore(UserAccountLink)
+        .from_select(["user_id", "account_id"], pairs)
+        .on_conflict_do_nothing()
+        .returning(UserAccountLink.user_id)
+    )
+    result = await session.exec(statement)
+    return result.scalars().all()
+
+
+async def remove_memberships(user_ids: List[int], account_ids: List[int], session: AsyncSession) -> List[int]:
+    """
+    Deletes the links between the given users and accounts with one DELETE.
+    Returns the user id of each link removed.
     """
-    Adds an existing user to multiple accounts."""
+    statement = (
+        delete(UserAccountLink)
+        .where(UserAccountLink.user_id.in_(user_ids))
+        .where(UserAccountLink.account_id.in_(account_ids))
+        .returning(UserAccountLink.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.exec(statement)
+    return result.scalars().all()
+
+
+async def apply_membership_diff(
+        user_ids: List[int],
+        add_account_ids: List[int],
+        remove_account_ids: List[int],
+        session: AsyncSession) -> dict:
+    """
+    Adds and removes account memberships for many users in the caller's
+    transaction, with at most one INSERT, one DELETE and one UPDATE. Users
+    left without accounts are kept. Returns the affected counts.
+    """
+    added = await add_memberships(user_ids, add_account_ids, session) if add_account_ids else []
+    removed = await remove_memberships(user_ids, remove_account_ids, session) if remove_account_ids else []
+
+    # Changed users' scoped tokens, cached principals and ETags are stale
+    changed_ids = set(added) | set(removed)
+    if changed_ids:
+        result = await session.exec(
+            update(User)
+            .where(User.id.in_(changed_ids))
+            .values(token_version=User.token_version + 1, version=User.version + 1)
+            .returning(User.email)
+            .execution_options(synchronize_session=False)
+        )
+        after_commit(session, principal_cache.invalidate, *result.scalars().all())
+
+    return {
+        "memberships_added": len(added),
+        "memberships_removed": len(removed),
+        "users_changed": len(changed_ids),
+    }
+
+
+def _memberships_changed(user: User, session: AsyncSession):
+    user.token_version += 1
+    user.version += 1
+    session.add(user)
+    after_commit(session, principal_cache.invalidate, user.email)
+
+
+async def add_user_to_accounts(user: User, account_ids: list[int], session: AsyncSession) -> int:
+    """
+    Adds an existing user to multiple accounts, skipping memberships that
+    already exist. Returns the number of accounts added. A loaded
+    user.accounts is not updated; see reload_user_accounts."""
     if isinstance(account_ids, int):
         account_ids = [account_ids]
-    result = await session.exec(select(Account).where(Account.id.in_(account_ids)))
-    accounts = result.all()
-    for account in accounts:
-        user.accounts.append(account)
-    session.add(user)
-    await session.commit()
-    await session.refresh(user)
-    return user
+    added = await add_memberships([user.id], account_ids, session)
+    if added:
+        _memberships_changed(user, session)
+        await session.flush()
+    return len(added)
 
 
-async def remove_user_from_account(user: User, account_id: int, session: AsyncSession):
+async def remove_user_from_account(user: User, account_id: int, session: AsyncSession) -> bool:
     """
-    Removes a user from a specific account by ID.
+    Removes a user from a specific account by ID. Returns whether the user
+    was a member.
     """
-    account = await session.get(Account, account_id)
-    if account and account in user.accounts:
-        user.accounts.remove(account)
-        session.add(user)
-        await session.commit()
-        await session.refresh(user)
+    removed = await remove_memberships([user.id], [account_id], session)
+    if removed:
+        _memberships_changed(user, session)
+        await session.flush()
+    return bool(removed)
+
+
+async def reload_user_accounts(user: User, session: AsyncSession):
+    """
+    Reloads user.accounts with one query, after memberships were changed
+    with statements that bypass the relationship.
+    """
+    result = await session.exec(
+        select(Account)
+        .join(UserAccountLink, UserAccountLink.account_id == Account.id)
+        .where(UserAccountLink.user_id == user.id)
+    )
+    set_committed_value(user, "accounts", result.all())
     return user
 
 
+async def count_user_accounts(user_id: int, session: AsyncSession) -> int:
+    """
+    Counts the accounts a user belongs to.
+    """
+    result = await session.exec(
+        select(func.count()).select_from(UserAccountLink).where(UserAccountLink.user_id == user_id)
+    )
+    return result.one()
+
 
 
-async def get_users_for_account(account_unique_id: str, session: AsyncSession):
+
+async def get_users_for_account(
+        account_id: int,
+        session: AsyncSession,
+        after_id: Optional[int] = None,
+        limit: Optional[int] = None,
+        columns=USER_BASIC_COLUMNS):
     """
-    Retrieves all User objects related to a given account_unique_id.
+    Retrieves (id, email, full_name) rows, or rows of the given columns, for
+    the users of a given account, ordered by id. Pass the last id of the
+    previous page as after_id to fetch the next page.
     """
     statement = (
-        select(User)
+        select(*columns)
         .join(UserAccountLink, UserAccountLink.user_id == User.id)
-        .join(Account, UserAccountLink.account_id == Account.id)
-        .where(Account.account_unique_id == account_unique_id)
-        .options(selectinload(User.accounts))  # eager load accounts if needed
+        .where(UserAccountLink.account_id == account_id)
+        .order_by(User.id)
     )
+    if after_id is not None:
+        statement = statement.where(User.id > after_id)
+    if limit is not None:
+        statement = statement.limit(limit)
 
     result = await session.exec(statement)
     users = result.all()
     return users
 
 
+async def stream_users_for_account(account_id: int, session: AsyncSession, batch_size: int = 1000):
+    """
+    Yields (id, email, full_name) rows for an account from a server-side cursor,
+    so memory stays constant regardless of the number of members.
+    """
+    statement = (
+        select(*USER_BASIC_COLUMNS)
+        .join(UserAccountLink, UserAccountLink.user_id == User.id)
+        .where(UserAccountLink.account_id == account_id)
+        .order_by(User.id)
+        .execution_options(yield_per=batch_size)
+    )
+    result = await session.stream(statement)
+    async for row in result:
+        yield row
+
+
 async def get_user_by_email(email: str, session: AsyncSession) -> User | None:
     """
     Retrieve a user object by email, eagerly loading their accounts.
@@ -87,6 +338,25 @@ async def get_user_by_email(email: str, session: AsyncSession) -> User | None:
     return user
 
 
+async def get_user_basic_by_id(user_id: int, session: AsyncSession):
+    """
+    Retrieve an (id, email, full_name) row for a user, without loading the
+    entity, its password hash or its accounts.
+    """
+    result = await session.exec(select(*USER_BASIC_COLUMNS).where(User.id == user_id))
+    return result.first()
+
+
+async def get_user_credentials_by_email(email: str, session: AsyncSession):
+    """
+    Retrieve an (id, email, password) row for a user by exact email, the
+    same match login and get_current_user use.
+    """
+    statement = select(User.id, User.email, User.password).where(User.email == email)
+    result = await session.exec(statement)
+    return result.first()
+
+
 async def get_user_with_accounts_by_email(email: str, session: AsyncSession) -> User | None:
     """
     Retrieve a user by email, eagerly loading their associated accounts."""
@@ -125,37 +395,31 @@ async def get_user_with_accounts(user_id: int, session: AsyncSession) -> User |
 async def update_user_in_db(user: User, email: Optional[str], full_name: Optional[str], session: AsyncSession):
     """
     Update user details in the database."""
-    if email:
+    previous_email = user.email
+    if email and email != user.email:
         user.email = email
-    if full_name:
+        user.token_version += 1
+        user.version += 1
+    if full_name and full_name != user.full_name:
         user.full_name = full_name
+        user.version += 1
 
     session.add(user)
-    await session.commit()
-    await session.refresh(user)
+    await session.flush()
+    after_commit(session, principal_cache.invalidate, previous_email, user.email)
     return user
 
 
 async def delete_user_in_db(user: User, session: AsyncSession):
     """
-    Deletes a user from the database."""
+    Deletes a user, and the reset and refresh tokens that reference it, from
+    the database."""
+    email = user.email
+    for model in (PasswordResetToken, RefreshToken):
+        await session.exec(
+            delete(model).where(model.user_id == user.id).execution_options(synchronize_session=False)
+        )
     await session.delete(user)
-    await session.commit()
+    await session.flush()
+    after_commit(session, principal_cache.invalidate, email)
     return
-
-
-async def get_orphaned_users_to_delete(account: Account, session: AsyncSession):
-    """
-    Retrieves users who would be orphaned when an account is deleted.
-    """
-    statement = select(Account).options(selectinload(Account.users)).where(Account.id == account.id)
-    result = await session.exec(statement)
-    account = result.one_or_none()
-
-    if not account:
-        return []
-    orphaned_users = []
-    for user in account.users:
-        if len(user.accounts) == 1 and user.accounts[0].id == account.id:
-            orphaned_users.append(user)
-    return orphaned_users
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""
+Minimal in-process ASGI client used by the benchmarks.
+
+Drives ``app.main.app`` directly so latency numbers measure the application
+and its event loop rather than a network stack.
+"""
+import asyncio
+import json
+import time
+from urllib.parse import urlencode
+
+
+async def request(app, method: str, path: str, headers: dict | None = None,
+                  body: bytes = b"", query: dict | None = None):
+    """
+    Sends a single request to the ASGI app and returns (status, headers, body)."""
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    raw_headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query or {}, doseq=True).encode(),
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    sent = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        # Like a real client, disconnect only once the response is complete,
+        # so streamed responses are not cut short
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    response = {"status": None, "headers": {}, "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {k.decode(): v.decode() for k, v in message["headers"]}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+
+async def get(app, path: str, headers: dict | None = None, query: dict | None = None):
+    return await request(app, "GET", path, headers=headers, query=query)
+
+
+async def post_json(app, path: str, payload, headers: dict | None = None):
+    headers = {**(headers or {}), "content-type": "application/json"}
+    return await request(app, "POST", path, headers=headers, body=json.dumps(payload).encode())
+
+
+async def post_form(app, path: str, form: dict, headers: dict | None = None):
+    headers = {**(headers or {}), "content-type": "application/x-www-form-urlencoded"}
+    return await request(app, "POST", path, headers=headers, body=urlencode(form).encode())
+
+
+async def timed(coro):
+    """
+    Awaits a request coroutine and returns (elapsed_ms, status)."""
+    start = time.perf_counter()
+    status, _, _ = await coro
+    return (time.perf_counter() - start) * 1000, status
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list[float]) -> dict:
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+        "max_ms": round(max(samples), 2) if samples else 0.0,
+    }
@@ -0,0 +1,78 @@
+"""
+Compares provisioning N users one POST /users/ at a time against a single
+POST /users/bulk/{account_unique_id}. Run against a seeded database:
+
+    python -m benchmarks.bulk_provision --email a@example.com --password secret \
+        --account-unique-id 0123456789abcdef --users 500
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from app.core.config import settings
+from benchmarks import asgi_client
+
+
+async def run(args):
+    from app.main import app
+
+    prefix = settings.API_V1_PREFIX
+    run_id = uuid.uuid4().hex[:8]
+    async with app.router.lifespan_context(app):
+        status, _, body = await asgi_client.post_form(
+            app, f"{prefix}/auth/login", {"username": args.email, "password": args.password}
+        )
+        if status != 200:
+            raise SystemExit(f"Login failed with {status}: {body!r}")
+        auth = {"authorization": f"Bearer {json.loads(body)['access_token']}"}
+        status, _, body = await asgi_client.get(app, f"{prefix}/accounts/{args.account_unique_id}", headers=auth)
+        if status != 200:
+            raise SystemExit(f"Account lookup failed with {status}: {body!r}")
+        account_id = json.loads(body)["id"]
+
+        started = time.perf_counter()
+        for i in range(args.users):
+            status, _, body = await asgi_client.post_json(app, f"{prefix}/users/", {
+                "email": f"single-{run_id}-{i}@bench.invalid",
+                "password": "benchmark",
+                "account_ids": [account_id],
+            }, headers=auth)
+            if status != 200:
+                raise SystemExit(f"Per-user create failed with {status}: {body!r}")
+        per_user = time.perf_counter() - started
+
+        payload = [
+            {"email": f"bulk-{run_id}-{i}@bench.invalid", "password": "benchmark"}
+            for i in range(args.users)
+        ]
+        started = time.perf_counter()
+        status, _, body = await asgi_client.post_json(
+            app, f"{prefix}/users/bulk/{args.account_unique_id}", payload, headers=auth
+        )
+        bulk = time.perf_counter() - started
+        if status != 200:
+            raise SystemExit(f"Bulk create failed with {status}: {body!r}")
+
+    report = {
+        "users": args.users,
+        "per_user_seconds": round(per_user, 3),
+        "per_user_rows_per_second": round(args.users / per_user, 1),
+        "bulk_seconds": round(bulk, 3),
+        "bulk_rows_per_second": round(args.users / bulk, 1),
+        "speedup": round(per_user / bulk, 2),
+    }
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--account-unique-id", required=True)
+    parser.add_argument("--users", type=int, default=500)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
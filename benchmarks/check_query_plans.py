@@ -0,0 +1,59 @@
+"""
+Fails when a hot lookup stops using an index.
+
+Builds the schema from the models in an in-memory SQLite database and runs
+EXPLAIN QUERY PLAN for the queries behind login, get_current_user, the
+forgot-password lookup and the account member listing. Any full table scan
+of the user or useraccountlink tables is reported and exits non-zero:
+
+    python -m benchmarks.check_query_plans
+"""
+import sys
+from sqlalchemy import create_engine, text
+from sqlmodel import SQLModel, select
+from app.models.accounts import Account
+from app.models.associations import UserAccountLink
+from app.models.users import User
+import app.models.security  # noqa: F401  (registers the table)
+
+HOT_QUERIES = {
+    "user by email": select(User).where(User.email == "someone@example.com"),
+    "members of account id": select(UserAccountLink.user_id).where(UserAccountLink.account_id == 1),
+    "account by account_unique_id": select(Account.id).where(Account.account_unique_id == "0123456789abcdef"),
+    "users for account id": (
+        select(User.id, User.email, User.full_name)
+        .join(UserAccountLink, UserAccountLink.user_id == User.id)
+        .where(UserAccountLink.account_id == 1)
+        .order_by(User.id)
+    ),
+}
+
+GUARDED_TABLES = ("user", "useraccountlink")
+
+
+def full_scans(plan_rows: list[str]) -> list[str]:
+    scans = []
+    for detail in plan_rows:
+        words = detail.split()
+        # "SCAN user" is a full scan; "SCAN user USING INDEX" walks an index in order
+        if len(words) >= 2 and words[0] == "SCAN" and words[1] in GUARDED_TABLES and "INDEX" not in words:
+            scans.append(detail)
+    return scans
+
+
+def main() -> int:
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(engine)
+    failures = 0
+    with engine.connect() as conn:
+        for name, statement in HOT_QUERIES.items():
+            sql = str(statement.compile(engine, compile_kwargs={"literal_binds": True}))
+            plan = [row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"))]
+            scans = full_scans(plan)
+            print(f"{'FAIL' if scans else 'ok  '} {name}: {' | '.join(plan)}")
+            failures += bool(scans)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
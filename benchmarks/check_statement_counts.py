@@ -0,0 +1,128 @@
+"""
+Fails when a write route issues more SQL statements than its budget.
+
+Boots app.main.app in-process against a throwaway SQLite database, runs each
+user and account write route once and reads the statement count reported in
+the Server-Timing header. The caller's principal is warmed before every
+measured request, so counts cover only the route's own work:
+
+    python -m benchmarks.check_statement_counts
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+import tempfile
+
+# Route -> maximum statements, excluding BEGIN/COMMIT
+BUDGETS = {
+    "create_account": 4,
+    "create_user": 4,
+    "update_user": 3,
+    "add_user_to_account (existing)": 5,
+    "add_user_to_account (new)": 4,
+    "update_account": 2,
+    "remove_user_from_account": 4,
+    "apply_membership_diff": 3,
+    "delete_user": 6,
+    "delete_account": 7,
+}
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def statement_count(headers: dict) -> int:
+    match = _QUERIES.search(headers.get("server-timing", ""))
+    if match is None:
+        raise SystemExit("No statement count in Server-Timing; is SERVER_TIMING_HEADER enabled?")
+    return int(match.group(1))
+
+
+async def run() -> dict[str, int]:
+    from sqlmodel import SQLModel
+    from app.core.config import settings
+    from app.core.db import async_engine
+    from app.main import app
+    from benchmarks import asgi_client
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    prefix = settings.API_V1_PREFIX
+    counts: dict[str, int] = {}
+    headers: dict = {}
+
+    async def measure(name: str, method: str, path: str, payload=None, query=None):
+        # Re-load the caller first, in case the previous write invalidated it
+        if headers:
+            await asgi_client.get(app, f"{prefix}/accounts/", headers=headers)
+        request_headers = {**headers, "content-type": "application/json"}
+        body = json.dumps(payload).encode() if payload is not None else b""
+        status, response_headers, response_body = await asgi_client.request(
+            app, method, path, headers=request_headers, body=body, query=query
+        )
+        if status != 200:
+            raise SystemExit(f"{name} failed with {status}: {response_body!r}")
+        counts[name] = statement_count(response_headers)
+        return json.loads(response_body)
+
+    async with app.router.lifespan_context(app):
+        account = await measure("create_account", "POST", f"{prefix}/accounts/", {
+            "account": {"account_organisation": "Statement Count"},
+            "user": {"email": "owner@counts.invalid", "password": "counts", "full_name": "Owner"},
+        })
+        status, _, body = await asgi_client.post_form(
+            app, f"{prefix}/auth/login", {"username": "owner@counts.invalid", "password": "counts"}
+        )
+        headers["authorization"] = f"Bearer {json.loads(body)['access_token']}"
+        other = await measure("create_account (second)", "POST", f"{prefix}/accounts/", {
+            "account": {"account_organisation": "Other"},
+            "user": {"email": "other@counts.invalid", "password": "counts"},
+        })
+        del counts["create_account (second)"]
+
+        user = await measure("create_user", "POST", f"{prefix}/users/", {
+            "email": "member@counts.invalid", "password": "counts", "account_ids": [account["id"]],
+        })
+        await measure("update_user", "PUT", f"{prefix}/users/{user['id']}", {"full_name": "Member"})
+        await measure("add_user_to_account (existing)", "PUT", f"{prefix}/users/add-user-to-account/", {
+            "account_id": [other["id"]],
+            "user": {"email": "member@counts.invalid", "password": "counts"},
+        })
+        await measure("add_user_to_account (new)", "PUT", f"{prefix}/users/add-user-to-account/", {
+            "account_id": [account["id"]],
+            "user": {"email": "new@counts.invalid", "password": "counts"},
+        })
+        await measure("update_account", "PUT", f"{prefix}/accounts/{account['account_unique_id']}",
+                      {"account_organisation": "Renamed"})
+        await measure("remove_user_from_account", "PUT", f"{prefix}/users/remove-user-from-account/",
+                      query={"user_id": user["id"], "account_id": other["id"]})
+        await measure("apply_membership_diff", "PATCH", f"{prefix}/users/memberships/", {
+            "user_ids": [user["id"]], "add_account_ids": [other["id"]], "remove_account_ids": [account["id"]],
+        })
+        await measure("delete_user", "DELETE", f"{prefix}/users/{user['id']}")
+        await measure("delete_account", "DELETE", f"{prefix}/accounts/{other['account_unique_id']}")
+
+    await async_engine.dispose()
+    return counts
+
+
+def main() -> int:
+    # Development mode uses ./dev.db, so load settings (and .env) here and
+    # then run from an empty directory
+    os.environ["ENV"] = "development"
+    import app.core.config  # noqa: F401
+    os.chdir(tempfile.mkdtemp(prefix="statement-counts-"))
+
+    counts = asyncio.run(run())
+    failures = 0
+    for name, budget in BUDGETS.items():
+        count = counts[name]
+        print(f"{'FAIL' if count > budget else 'ok  '} {name}: {count} statements (budget {budget})")
+        failures += count > budget
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""
+Compares two benchmarks.load reports and flags latency regressions:
+
+    python -m benchmarks.compare results/main.json results/branch.json --threshold 10
+
+Exits non-zero when any route's p99 grows by more than the threshold percent.
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=10, help="Allowed p99 growth in percent")
+    args = parser.parse_args()
+
+    baseline = json.loads(args.baseline.read_text())
+    candidate = json.loads(args.candidate.read_text())
+    print(f"{baseline.get('commit')} -> {candidate.get('commit')}: throughput "
+          f"{baseline['throughput_rps']} -> {candidate['throughput_rps']} rps "
+          f"({_change(baseline['throughput_rps'], candidate['throughput_rps']):+.1f}%)")
+
+    regressions = 0
+    for route, after in candidate["routes"].items():
+        before = baseline["routes"].get(route)
+        if not before:
+            continue
+        p99_change = _change(before["p99_ms"], after["p99_ms"])
+        flag = "REGRESSION" if p99_change > args.threshold else ""
+        regressions += bool(flag)
+        print(f"  {route:<16} p50 {before['p50_ms']:>8} -> {after['p50_ms']:<8} "
+              f"p99 {before['p99_ms']:>8} -> {after['p99_ms']:<8} ({p99_change:+.1f}%) {flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
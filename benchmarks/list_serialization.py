@@ -0,0 +1,106 @@
+"""
+Rows-per-second benchmark for the account member listing: loading full User
+entities and serializing them through FastAPI's response_model pass, against
+selecting (id, email, full_name) rows and dumping them with the prebuilt
+TypeAdapter used by list_users:
+
+    python -m benchmarks.list_serialization --rows 1000 --iterations 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models.accounts import Account
+from app.models.associations import UserAccountLink
+from app.models.users import User
+from app.schemas.users import UserReadBasic, user_list_adapter
+from app.utils.responses import json_list_response
+import app.models.security  # noqa: F401  (registers the table)
+import app.models.email  # noqa: F401  (registers the table)
+
+ACCOUNT_UNIQUE_ID = "0123456789abcdef"
+
+
+async def _seed(engine, rows: int):
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(insert(Account), [{"id": 1, "account_organisation": "Bench",
+                                              "account_unique_id": ACCOUNT_UNIQUE_ID}])
+        await conn.execute(insert(User), [
+            {"id": i, "email": f"user{i}@bench.invalid", "password": "x" * 60, "full_name": f"User {i}"}
+            for i in range(1, rows + 1)
+        ])
+        await conn.execute(insert(UserAccountLink), [
+            {"user_id": i, "account_id": 1} for i in range(1, rows + 1)
+        ])
+
+
+def _members(*columns):
+    return (
+        select(*columns)
+        .join(UserAccountLink, UserAccountLink.user_id == User.id)
+        .join(Account, UserAccountLink.account_id == Account.id)
+        .where(Account.account_unique_id == ACCOUNT_UNIQUE_ID)
+        .order_by(User.id)
+    )
+
+
+async def _rows_per_second(engine, render, iterations: int) -> float:
+    async with AsyncSession(engine) as session:
+        body = await render(session)  # warm statement caches
+        rows = len(json.loads(body))
+    started = time.perf_counter()
+    for _ in range(iterations):
+        # Fresh session per iteration, as each request gets its own
+        async with AsyncSession(engine) as session:
+            await render(session)
+    return rows * iterations / (time.perf_counter() - started)
+
+
+async def run(args) -> dict:
+    engine = create_async_engine(
+        "sqlite+aiosqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    await _seed(engine, args.rows)
+    field = create_model_field(name="Response_list_users", type_=List[UserReadBasic], mode="serialization")
+
+    async def response_model_path(session):
+        users = (await session.exec(_members(User))).all()
+        content = await serialize_response(field=field, response_content=users)
+        return JSONResponse(content).body
+
+    async def type_adapter_path(session):
+        rows = (await session.exec(_members(User.id, User.email, User.full_name))).all()
+        return json_list_response(user_list_adapter, rows).body
+
+    before = await _rows_per_second(engine, response_model_path, args.iterations)
+    after = await _rows_per_second(engine, type_adapter_path, args.iterations)
+    await engine.dispose()
+    return {
+        "rows": args.rows,
+        "iterations": args.iterations,
+        "response_model_rows_per_second": round(before),
+        "type_adapter_rows_per_second": round(after),
+        "speedup": round(after / before, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000, help="Members in the listed account")
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
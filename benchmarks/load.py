@@ -0,0 +1,219 @@
+"""
+Load benchmark for the v1 API. Boots app.main.app in-process against the
+configured (seeded) database, drives a weighted mix of routes at a fixed
+concurrency and reports throughput plus p50/p95/p99 latency per route:
+
+    python -m benchmarks.seed --users 100000 --create-tables
+    python -m benchmarks.load --concurrency 32 --duration 30 --output results/run.json
+
+The JSON output includes the git commit, so runs can be diffed with
+benchmarks.compare.
+"""
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from sqlalchemy import select
+from app.core.config import settings
+from app.core.db import async_session
+from app.models.users import User
+from benchmarks import asgi_client
+from benchmarks.seed import SEED_EMAIL_DOMAIN, SEED_PASSWORD
+
+# Route name -> relative weight in the traffic mix
+DEFAULT_MIX = {
+    "login": 2,
+    "list_accounts": 25,
+    "get_account": 15,
+    "list_users": 30,
+    "get_user": 10,
+    "create_user": 6,
+    "update_user": 6,
+    "update_account": 6,
+}
+
+
+@dataclass
+class Principal:
+    email: str
+    user_id: int
+    headers: dict = field(default_factory=dict)
+    account_ids: list[int] = field(default_factory=list)
+    account_unique_ids: list[str] = field(default_factory=list)
+
+
+class Workload:
+    def __init__(self, app, principals: list[Principal], rng: random.Random):
+        self.app = app
+        self.prefix = settings.API_V1_PREFIX
+        self.principals = principals
+        self.rng = rng
+        self.run_id = uuid.uuid4().hex[:8]
+        self.created = 0
+
+    async def login(self, p: Principal):
+        return await asgi_client.post_form(
+            self.app, f"{self.prefix}/auth/login", {"username": p.email, "password": SEED_PASSWORD}
+        )
+
+    async def list_accounts(self, p: Principal):
+        return await asgi_client.get(self.app, f"{self.prefix}/accounts/", headers=p.headers)
+
+    async def get_account(self, p: Principal):
+        unique_id = self.rng.choice(p.account_unique_ids)
+        return await asgi_client.get(self.app, f"{self.prefix}/accounts/{unique_id}", headers=p.headers)
+
+    async def list_users(self, p: Principal):
+        unique_id = self.rng.choice(p.account_unique_ids)
+        return await asgi_client.get(self.app, f"{self.prefix}/users/{unique_id}", headers=p.headers)
+
+    async def get_user(self, p: Principal):
+        return await asgi_client.get(self.app, f"{self.prefix}/users/get-user/{p.user_id}", headers=p.headers)
+
+    async def create_user(self, p: Principal):
+        self.created += 1
+        return await asgi_client.post_json(self.app, f"{self.prefix}/users/", {
+            "email": f"load-{self.run_id}-{self.created}@bench.invalid",
+            "password": SEED_PASSWORD,
+            "account_ids": [self.rng.choice(p.account_ids)],
+        }, headers=p.headers)
+
+    async def update_user(self, p: Principal):
+        return await asgi_client.request(
+            self.app, "PUT", f"{self.prefix}/users/{p.user_id}",
+            headers={**p.headers, "content-type": "application/json"},
+            body=json.dumps({"full_name": f"Load {self.rng.randrange(1_000_000)}"}).encode(),
+        )
+
+    async def update_account(self, p: Principal):
+        unique_id = self.rng.choice(p.account_unique_ids)
+        return await asgi_client.request(
+            self.app, "PUT", f"{self.prefix}/accounts/{unique_id}",
+            headers={**p.headers, "content-type": "application/json"},
+            body=json.dumps({"account_organisation": f"Load Org {self.rng.randrange(1_000_000)}"}).encode(),
+        )
+
+
+async def _prepare_principals(app, count: int, rng: random.Random) -> list[Principal]:
+    async with async_session() as session:
+        result = await session.exec(
+            select(User.id, User.email)
+            .where(User.email.like(f"%@{SEED_EMAIL_DOMAIN}"))
+            .limit(count * 20)
+        )
+        candidates = result.all()
+    if not candidates:
+        raise SystemExit("No seeded users found; run `python -m benchmarks.seed` first")
+
+    prefix = settings.API_V1_PREFIX
+    principals = []
+    for user_id, email in rng.sample(candidates, min(count, len(candidates))):
+        status, _, body = await asgi_client.post_form(
+            app, f"{prefix}/auth/login", {"username": email, "password": SEED_PASSWORD}
+        )
+        if status != 200:
+            raise SystemExit(f"Login for {email} failed with {status}: {body!r}")
+        headers = {"authorization": f"Bearer {json.loads(body)['access_token']}"}
+        status, _, body = await asgi_client.get(app, f"{prefix}/accounts/", headers=headers)
+        accounts = json.loads(body)
+        principals.append(Principal(
+            email=email,
+            user_id=user_id,
+            headers=headers,
+            account_ids=[a["id"] for a in accounts],
+            account_unique_ids=[a["account_unique_id"] for a in accounts],
+        ))
+    return principals
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    # Every simulated client shares one IP, which the auth rate limits would throttle
+    settings.RATE_LIMIT_ENABLED = False
+    from app.main import app
+
+    rng = random.Random(args.random_seed)
+    mix = {name: weight for name, weight in DEFAULT_MIX.items() if name not in args.exclude}
+    names, weights = list(mix), list(mix.values())
+    samples: dict[str, list[float]] = {name: [] for name in names}
+    errors: dict[str, int] = {name: 0 for name in names}
+
+    async with app.router.lifespan_context(app):
+        principals = await _prepare_principals(app, args.principals, rng)
+        workload = Workload(app, principals, rng)
+
+        async def worker(deadline: float, record: bool):
+            while time.perf_counter() < deadline:
+                name = rng.choices(names, weights)[0]
+                principal = rng.choice(principals)
+                elapsed, status = await asgi_client.timed(getattr(workload, name)(principal))
+                if record:
+                    samples[name].append(elapsed)
+                    if status >= 400:
+                        errors[name] += 1
+
+        if args.warmup > 0:
+            deadline = time.perf_counter() + args.warmup
+            await asyncio.gather(*(worker(deadline, record=False) for _ in range(args.concurrency)))
+
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(*(worker(deadline, record=True) for _ in range(args.concurrency)))
+        wall = time.perf_counter() - started
+
+    total = sum(len(s) for s in samples.values())
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "database": settings.database_url.split("://")[0],
+        "concurrency": args.concurrency,
+        "duration_seconds": round(wall, 2),
+        "requests": total,
+        "throughput_rps": round(total / wall, 1),
+        "routes": {
+            name: {
+                **asgi_client.summarize(route_samples),
+                "throughput_rps": round(len(route_samples) / wall, 1),
+                "errors": errors[name],
+            }
+            for name, route_samples in samples.items()
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="Unmeasured seconds before the run")
+    parser.add_argument("--principals", type=int, default=50, help="Seeded users to log in as")
+    parser.add_argument("--exclude", nargs="*", default=[], choices=list(DEFAULT_MIX),
+                        help="Routes to leave out of the mix")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures /health and /users latency while a storm of logins runs.
+
+Before the hashing pool, every bcrypt call blocked the event loop so the
+unrelated probes inherited the login latency. Run against a seeded database:
+
+    python -m benchmarks.login_storm --email a@example.com --password secret \
+        --account-unique-id 0123456789abcdef --logins 200 --concurrency 32
+"""
+import argparse
+import asyncio
+import json
+import time
+from app.core.config import settings
+from benchmarks import asgi_client
+
+
+async def run(args):
+    # Every simulated client shares one IP, which the auth rate limits would throttle
+    settings.RATE_LIMIT_ENABLED = False
+    from app.main import app
+
+    prefix = settings.API_V1_PREFIX
+    async with app.router.lifespan_context(app):
+        status, _, body = await asgi_client.post_form(
+            app, f"{prefix}/auth/login", {"username": args.email, "password": args.password}
+        )
+        if status != 200:
+            raise SystemExit(f"Login failed with {status}: {body!r}")
+        auth = {"authorization": f"Bearer {json.loads(body)['access_token']}"}
+
+        remaining = args.logins
+        login_samples: list[float] = []
+
+        async def login_worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                elapsed, _ = await asgi_client.timed(asgi_client.post_form(
+                    app, f"{prefix}/auth/login", {"username": args.email, "password": args.password}
+                ))
+                login_samples.append(elapsed)
+
+        health_samples: list[float] = []
+        users_samples: list[float] = []
+
+        async def probe(done: asyncio.Event):
+            while not done.is_set():
+                elapsed, _ = await asgi_client.timed(asgi_client.get(app, "/health"))
+                health_samples.append(elapsed)
+                elapsed, _ = await asgi_client.timed(asgi_client.get(
+                    app, f"{prefix}/users/{args.account_unique_id}", headers=auth
+                ))
+                users_samples.append(elapsed)
+                await asyncio.sleep(args.probe_interval)
+
+        done = asyncio.Event()
+        started = time.perf_counter()
+        probe_task = asyncio.create_task(probe(done))
+        await asyncio.gather(*(login_worker() for _ in range(args.concurrency)))
+        done.set()
+        await probe_task
+        wall = time.perf_counter() - started
+
+    report = {
+        "executor": settings.PASSWORD_HASH_EXECUTOR,
+        "workers": settings.PASSWORD_HASH_WORKERS,
+        "wall_seconds": round(wall, 2),
+        "login": asgi_client.summarize(login_samples),
+        "health": asgi_client.summarize(health_samples),
+        "users": asgi_client.summarize(users_samples),
+    }
+    print(json.dumps(report, indent=2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--account-unique-id", required=True)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--probe-interval", type=float, default=0.01)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
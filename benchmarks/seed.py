@@ -0,0 +1,115 @@
+"""
+Seeds the configured database with synthetic accounts and users for the
+load benchmarks. Rows are generated lazily and written with multi-row
+inserts in chunks, so millions of users stay within constant memory:
+
+    python -m benchmarks.seed --accounts 10000 --users 1000000 --create-tables
+
+Every seeded user has the password "benchmark" and an email of the form
+user<N>@seed.invalid.
+"""
+import argparse
+import asyncio
+import random
+import time
+from sqlalchemy import func, insert, select
+from sqlmodel import SQLModel
+from app.core.db import async_engine
+from app.core.password_hasher import _hash
+from app.models.accounts import Account
+from app.models.associations import UserAccountLink
+from app.models.users import User
+import app.models.email  # noqa: F401  (registers the table)
+import app.models.security  # noqa: F401  (registers the table)
+
+SEED_PASSWORD = "benchmark"
+SEED_EMAIL_DOMAIN = "seed.invalid"
+
+
+def _chunked(rows, size: int):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def _next_id(conn, model) -> int:
+    return ((await conn.execute(select(func.max(model.id)))).scalar() or 0) + 1
+
+
+async def seed(accounts: int, users: int, extra_membership_rate: float, chunk_size: int,
+               create_tables: bool, random_seed: int):
+    rng = random.Random(random_seed)
+    # One bcrypt hash shared by every row; hashing millions would take days
+    password_hash = _hash(SEED_PASSWORD)
+
+    if create_tables:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+    started = time.perf_counter()
+    async with async_engine.begin() as conn:
+        first_account = await _next_id(conn, Account)
+        first_user = await _next_id(conn, User)
+        account_ids = range(first_account, first_account + accounts)
+        user_ids = range(first_user, first_user + users)
+
+        for chunk in _chunked(({
+            "id": account_id,
+            "account_organisation": f"Seed Organisation {account_id}",
+            "account_unique_id": f"seed{account_id:012x}",
+        } for account_id in account_ids), chunk_size):
+            await conn.execute(insert(Account), chunk)
+
+        for chunk in _chunked(({
+            "id": user_id,
+            "email": f"user{user_id}@{SEED_EMAIL_DOMAIN}",
+            "password": password_hash,
+            "full_name": f"Seed User {user_id}",
+        } for user_id in user_ids), chunk_size):
+            await conn.execute(insert(User), chunk)
+
+        def memberships():
+            for user_id in user_ids:
+                home = account_ids[user_id % accounts]
+                yield {"user_id": user_id, "account_id": home}
+                if accounts > 1 and rng.random() < extra_membership_rate:
+                    other = rng.choice(account_ids)
+                    if other != home:
+                        yield {"user_id": user_id, "account_id": other}
+
+        links = 0
+        for chunk in _chunked(memberships(), chunk_size):
+            await conn.execute(insert(UserAccountLink), chunk)
+            links += len(chunk)
+
+    elapsed = time.perf_counter() - started
+    print(f"Seeded {accounts} accounts, {users} users and {links} memberships in {elapsed:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--extra-membership-rate", type=float, default=0.2,
+                        help="Share of users who also belong to a second account")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--create-tables", action="store_true")
+    parser.add_argument("--random-seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(seed(
+        accounts=args.accounts,
+        users=args.users,
+        extra_membership_rate=args.extra_membership_rate,
+        chunk_size=args.chunk_size,
+        create_tables=args.create_tables,
+        random_seed=args.random_seed,
+    ))
+
+
+if __name__ == "__main__":
+    main()
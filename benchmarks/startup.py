@@ -0,0 +1,88 @@
+"""
+Fails when application startup exceeds its budget.
+
+Starts fresh interpreters that import app.main, run the lifespan and serve a
+first /health request, and reports the median import time and time to that
+first successful response. It also fails if a module that should only load
+on first use (boto3, python-jose, passlib) is imported at startup:
+
+    python -m benchmarks.startup --runs 5 --max-import-seconds 1.5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+# Imported on first use only; loading them at startup is a regression
+DEFERRED_MODULES = ("boto3", "botocore", "jose", "passlib")
+
+_CHILD = """
+import asyncio, json, os, sys, time
+started = time.perf_counter()
+sys.path[0] = os.getcwd()
+import app.core.config
+# Development mode uses ./dev.db; keep it out of the working tree
+os.chdir(sys.argv[1])
+import app.main
+imported = time.perf_counter()
+deferred = [name for name in sys.argv[2].split(",") if name in sys.modules]
+
+from benchmarks import asgi_client
+
+async def first_request():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        status, _, _ = await asgi_client.get(app.main.app, "/health")
+        return status
+
+status = asyncio.run(first_request())
+print(json.dumps({
+    "import_seconds": imported - started,
+    "first_request_seconds": time.perf_counter() - started,
+    "status": status,
+    "deferred_imported": deferred,
+}))
+"""
+
+
+def measure_once(workdir: str) -> dict:
+    env = {**os.environ, "ENV": "development", "LOG_LEVEL": "WARNING"}
+    completed = subprocess.run(
+        [sys.executable, "-c", _CHILD, workdir, ",".join(DEFERRED_MODULES)],
+        capture_output=True, text=True, env=env,
+    )
+    if completed.returncode != 0:
+        raise SystemExit(f"Startup run failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-import-seconds", type=float, default=1.5)
+    parser.add_argument("--max-first-request-seconds", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="startup-")
+    runs = [measure_once(workdir) for _ in range(args.runs)]
+    import_seconds = statistics.median(run["import_seconds"] for run in runs)
+    first_request_seconds = statistics.median(run["first_request_seconds"] for run in runs)
+    deferred_imported = sorted({name for run in runs for name in run["deferred_imported"]})
+
+    checks = [
+        (f"import app.main: {import_seconds:.3f}s (budget {args.max_import_seconds}s)",
+         import_seconds <= args.max_import_seconds),
+        (f"first request: {first_request_seconds:.3f}s (budget {args.max_first_request_seconds}s)",
+         first_request_seconds <= args.max_first_request_seconds and all(run["status"] == 200 for run in runs)),
+        (f"deferred modules imported at startup: {', '.join(deferred_imported) or 'none'}",
+         not deferred_imported),
+    ]
+    for description, ok in checks:
+        print(f"{'ok  ' if ok else 'FAIL'} {description}")
+    return 0 if all(ok for _, ok in checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
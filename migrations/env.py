@@ -3,7 +3,7 @@ from sqlmodel import SQLModel
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from app.core.config import settings
-from app.models import users, accounts, associations
+from app.models import users, accounts, associations, security, email
 
 
 from alembic import context
@@ -0,0 +1,29 @@
+"""Add email and account link indexes
+
+Revision ID: 3c9d2f61b7a4
+Revises: e31fbbd98a45
+Create Date: 2026-10-18 09:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9d2f61b7a4'
+down_revision: Union[str, None] = 'e31fbbd98a45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fails if duplicate emails already exist; resolve those before upgrading
+    op.create_index(op.f('ix_user_email'), 'user', ['email'], unique=True)
+    op.create_index(op.f('ix_useraccountlink_account_id'), 'useraccountlink', ['account_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_useraccountlink_account_id'), table_name='useraccountlink')
+    op.drop_index(op.f('ix_user_email'), table_name='user')
@@ -0,0 +1,44 @@
+"""Add EmailOutbox table
+
+Revision ID: 8f41c0a9d2e6
+Revises: 3c9d2f61b7a4
+Create Date: 2026-10-18 11:40:03.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f41c0a9d2e6'
+down_revision: Union[str, None] = '3c9d2f61b7a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'emailoutbox',
+        sa.Column('id', sa.Integer, primary_key=True, nullable=False),
+        sa.Column('to_email', sa.String, nullable=False),
+        sa.Column('subject', sa.String, nullable=False),
+        sa.Column('text_body', sa.String, nullable=False),
+        sa.Column('html_body', sa.String, nullable=False),
+        sa.Column('status', sa.String, nullable=False),
+        sa.Column('attempts', sa.Integer, nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime, nullable=False),
+        sa.Column('last_error', sa.String, nullable=True),
+        sa.Column('provider_message_id', sa.String, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+        sa.Column('sent_at', sa.DateTime, nullable=True),
+    )
+    op.create_index(op.f('ix_emailoutbox_status'), 'emailoutbox', ['status'], unique=False)
+    op.create_index(op.f('ix_emailoutbox_next_attempt_at'), 'emailoutbox', ['next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_emailoutbox_next_attempt_at'), table_name='emailoutbox')
+    op.drop_index(op.f('ix_emailoutbox_status'), table_name='emailoutbox')
+    op.drop_table('emailoutbox')
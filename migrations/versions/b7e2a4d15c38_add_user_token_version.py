@@ -0,0 +1,28 @@
+"""Add token_version to User
+
+Revision ID: b7e2a4d15c38
+Revises: 8f41c0a9d2e6
+Create Date: 2026-10-18 14:05:27.118402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2a4d15c38'
+down_revision: Union[str, None] = '8f41c0a9d2e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.add_column(sa.Column('token_version', sa.Integer, nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('token_version')
@@ -0,0 +1,32 @@
+"""Add version to Account and User
+
+Revision ID: c4e9a71b2f53
+Revises: f5c81e27a4d9
+Create Date: 2026-10-18 19:42:08.530117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a71b2f53'
+down_revision: Union[str, None] = 'f5c81e27a4d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('account') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer, nullable=False, server_default='0'))
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer, nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('version')
+    with op.batch_alter_table('account') as batch_op:
+        batch_op.drop_column('version')
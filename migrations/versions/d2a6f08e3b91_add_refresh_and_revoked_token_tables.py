@@ -0,0 +1,53 @@
+"""Add RefreshToken and RevokedAccessToken tables
+
+Revision ID: d2a6f08e3b91
+Revises: b7e2a4d15c38
+Create Date: 2026-10-18 15:32:50.674215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a6f08e3b91'
+down_revision: Union[str, None] = 'b7e2a4d15c38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'refreshtoken',
+        sa.Column('id', sa.Integer, primary_key=True, nullable=False),
+        sa.Column('user_id', sa.Integer, sa.ForeignKey('user.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('token_hash', sa.String, nullable=False),
+        sa.Column('family_id', sa.String, nullable=False),
+        sa.Column('expires_at', sa.DateTime, nullable=False),
+        sa.Column('revoked_at', sa.DateTime, nullable=True),
+        sa.Column('created_at', sa.DateTime, nullable=False),
+    )
+    op.create_index(op.f('ix_refreshtoken_user_id'), 'refreshtoken', ['user_id'], unique=False)
+    op.create_index(op.f('ix_refreshtoken_token_hash'), 'refreshtoken', ['token_hash'], unique=True)
+    op.create_index(op.f('ix_refreshtoken_family_id'), 'refreshtoken', ['family_id'], unique=False)
+
+    op.create_table(
+        'revokedaccesstoken',
+        sa.Column('jti', sa.String, primary_key=True, nullable=False),
+        sa.Column('expires_at', sa.DateTime, nullable=False),
+        sa.Column('revoked_at', sa.DateTime, nullable=False),
+    )
+    op.create_index(op.f('ix_revokedaccesstoken_expires_at'), 'revokedaccesstoken', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_revokedaccesstoken_revoked_at'), 'revokedaccesstoken', ['revoked_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_revokedaccesstoken_revoked_at'), table_name='revokedaccesstoken')
+    op.drop_index(op.f('ix_revokedaccesstoken_expires_at'), table_name='revokedaccesstoken')
+    op.drop_table('revokedaccesstoken')
+    op.drop_index(op.f('ix_refreshtoken_family_id'), table_name='refreshtoken')
+    op.drop_index(op.f('ix_refreshtoken_token_hash'), table_name='refreshtoken')
+    op.drop_index(op.f('ix_refreshtoken_user_id'), table_name='refreshtoken')
+    op.drop_table('refreshtoken')
@@ -0,0 +1,28 @@
+"""Add expires_at indexes to passwordresettoken and refreshtoken
+
+Revision ID: f5c81e27a4d9
+Revises: d2a6f08e3b91
+Create Date: 2026-10-18 17:05:12.318402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c81e27a4d9'
+down_revision: Union[str, None] = 'd2a6f08e3b91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_passwordresettoken_expires_at'), 'passwordresettoken', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_refreshtoken_expires_at'), 'refreshtoken', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_refreshtoken_expires_at'), table_name='refreshtoken')
+    op.drop_index(op.f('ix_passwordresettoken_expires_at'), table_name='passwordresettoken')
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import pytest
+
+# Tests always run against a throwaway SQLite database and never send mail
+os.environ["ENV"] = "development"
+os.environ["EMAIL_TRANSPORT"] = "fake"
+os.environ["EMAIL_OUTBOX_ENABLED"] = "false"
+for name, value in {
+    "DATABASE_URL": "sqlite+aiosqlite:///dev.db",
+    "FE_BASE_URL": "http://localhost:3000",
+    "AWS_SES_REGION": "eu-west-1",
+    "AWS_ACCESS_KEY": "test",
+    "AWS_SECRET_KEY": "test",
+    "AWS_SES_VERIFIED_MAIL": "noreply@example.com",
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    # Every test logs in from the same client address
+    "LOGIN_RATE_LIMIT_PER_IP": "1000",
+}.items():
+    os.environ.setdefault(name, value)
+
+# Development mode uses ./dev.db, so load settings (and .env) here and
+# then run from an empty directory
+import app.core.config  # noqa: E402,F401
+os.chdir(tempfile.mkdtemp(prefix="tests-"))
+
+from tests.helpers import ApiClient, unique_email  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def session(anyio_backend):
+    """
+    An AsyncSession on a freshly created schema, dropped again afterwards.
+    """
+    from sqlmodel import SQLModel
+    from app.core.db import async_engine, async_session
+    # Register every table before create_all
+    import app.models.accounts, app.models.associations, app.models.email  # noqa: F401
+    import app.models.security, app.models.users  # noqa: F401
+
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+    async with async_session() as session:
+        yield session
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.drop_all)
+    # Pooled connections belong to this test's event loop
+    await async_engine.dispose()
+
+
+@pytest.fixture
+async def api(session) -> ApiClient:
+    """
+    A client for the app on the fresh schema of the session fixture.
+    """
+    return ApiClient()
+
+
+@pytest.fixture
+async def owner_account(api) -> dict:
+    """
+    A new account whose first user is logged in on the api client.
+    """
+    email = unique_email("owner")
+    response = await api.request("POST", "/accounts/", {
+        "account": {"account_organisation": "Test Org"},
+        "user": {"email": email, "password": "owner-password", "full_name": "Owner"},
+    })
+    assert response.status == 200, response.body
+    assert (await api.login(email, "owner-password")).status == 200
+    return response.json()
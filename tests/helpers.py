@@ -0,0 +1,80 @@
+"""
+Helpers shared by the tests: an in-process API client and request builders.
+"""
+import json
+import uuid
+from dataclasses import dataclass
+from urllib.parse import urlencode
+
+
+@dataclass
+class ApiResponse:
+    status: int
+    headers: dict
+    body: bytes
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class ApiClient:
+    """
+    Sends requests to app.main.app in-process, under the API prefix and with
+    the bearer token of the last login.
+    """
+    def __init__(self):
+        from app.core.config import settings
+        from app.main import app
+        self.app = app
+        self.prefix = settings.API_V1_PREFIX
+        self.headers: dict = {}
+        self.email: str | None = None
+
+    async def request(self, method: str, path: str, json_body=None, query: dict | None = None,
+                      headers: dict | None = None, body: bytes = b"", content_type: str = "application/json"):
+        from benchmarks import asgi_client
+        if json_body is not None:
+            body = json.dumps(json_body).encode()
+        status, response_headers, response_body = await asgi_client.request(
+            self.app, method, self.prefix + path,
+            headers={**self.headers, "content-type": content_type, **(headers or {})},
+            body=body, query=query,
+        )
+        return ApiResponse(status, response_headers, response_body)
+
+    async def login(self, email: str, password: str) -> ApiResponse:
+        response = await self.request(
+            "POST", "/auth/login",
+            body=urlencode({"username": email, "password": password}).encode(),
+            content_type="application/x-www-form-urlencoded",
+        )
+        if response.status == 200:
+            self.email = email
+            self.headers["authorization"] = f"Bearer {response.json()['access_token']}"
+        return response
+
+
+def unique_email(name: str = "user") -> str:
+    return f"{name}-{uuid.uuid4().hex[:8]}@example.com"
+
+
+def encode_multipart(fields: dict[str, str], files: dict[str, tuple[str, bytes]] | None = None) -> tuple[bytes, str]:
+    """
+    Builds a multipart/form-data body; files map a field to (filename, content).
+    Returns the body and its content type.
+    """
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in fields.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'.encode()
+            + value.encode() + b"\r\n"
+        )
+    for name, (filename, content) in (files or {}).items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n".encode()
+            + content + b"\r\n"
+        )
+    parts.append(f"--{boundary}--\r\n".encode())
+    return b"".join(parts), f"multipart/form-data; boundary={boundary}"
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import text
+from sqlmodel import select
+from app.models.accounts import Account
+from app.models.associations import UserAccountLink
+from app.models.security import PasswordResetToken, RefreshToken
+from app.models.users import User
+from app.utils.accounts import delete_account_and_orphaned_users
+
+pytestmark = pytest.mark.anyio
+
+
+# With foreign keys enforced, SQLite cascades links with their users as Postgres does
+@pytest.mark.parametrize("foreign_keys", ["OFF", "ON"])
+async def test_reports_rows_deleted_per_table(session, foreign_keys):
+    await session.exec(text(f"PRAGMA foreign_keys={foreign_keys}"))
+    deleted, kept = Account(account_organisation="Deleted", account_unique_id="deleted"), \
+        Account(account_organisation="Kept", account_unique_id="kept")
+    only_deleted, both, only_kept = (User(email=f"{name}@example.com", password="x")
+                                     for name in ("only-deleted", "both", "only-kept"))
+    session.add_all([deleted, kept, only_deleted, both, only_kept])
+    await session.flush()
+    session.add_all([
+        UserAccountLink(user_id=only_deleted.id, account_id=deleted.id),
+        UserAccountLink(user_id=both.id, account_id=deleted.id),
+        UserAccountLink(user_id=both.id, account_id=kept.id),
+        UserAccountLink(user_id=only_kept.id, account_id=kept.id),
+        PasswordResetToken(user_id=only_deleted.id, token="reset", expires_at=datetime.now()),
+        RefreshToken(user_id=only_deleted.id, token_hash="hash", family_id="family",
+                     expires_at=datetime.now() + timedelta(days=1)),
+        RefreshToken(user_id=both.id, token_hash="other-hash", family_id="other",
+                     expires_at=datetime.now() + timedelta(days=1)),
+    ])
+    await session.commit()
+    both_id, both_token_version = both.id, both.token_version
+
+    counts = await delete_account_and_orphaned_users(deleted.id, session)
+    await session.commit()
+
+    assert counts == {
+        "accounts_deleted": 1,
+        "users_deleted": 1,
+        "memberships_deleted": 2,
+        "reset_tokens_deleted": 1,
+        "refresh_tokens_deleted": 1,
+    }
+    session.expire_all()
+    assert (await session.exec(select(User.email).order_by(User.id))).all() == [
+        "both@example.com", "only-kept@example.com",
+    ]
+    assert len((await session.exec(select(UserAccountLink))).all()) == 2
+    assert len((await session.exec(select(RefreshToken))).all()) == 1
+    assert (await session.get(User, both_id)).token_version == both_token_version + 1
+
+
+async def test_delete_route_reports_counts(api, owner_account):
+    response = await api.request("DELETE", f"/accounts/{owner_account['account_unique_id']}")
+    assert response.status == 200
+    body = response.json()
+    assert (body["accounts_deleted"], body["users_deleted"], body["memberships_deleted"]) == (1, 1, 1)
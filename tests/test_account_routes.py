@@ -0,0 +1,93 @@
+import anyio
+import pytest
+from sqlalchemy import delete
+from sqlmodel import select
+from app.api.v1 import accounts as account_routes
+from app.core.account_cache import account_cache
+from app.core.db import async_session
+from app.core.principal_cache import principal_cache
+from app.models.accounts import Account
+from app.models.associations import UserAccountLink
+from tests.helpers import unique_email
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_create_account_hashes_before_opening_a_write_transaction(api, monkeypatch):
+    hash_password = account_routes.hash_password
+
+    async def hash_while_another_request_writes(password):
+        # Blocks on SQLite's write lock if the route already holds it
+        with anyio.fail_after(2):
+            async with async_session() as other:
+                other.add(Account(account_organisation="Concurrent", account_unique_id="concurrent"))
+                await other.commit()
+        return await hash_password(password)
+
+    monkeypatch.setattr(account_routes, "hash_password", hash_while_another_request_writes)
+    response = await api.request("POST", "/accounts/", {
+        "account": {"account_organisation": "New"},
+        "user": {"email": unique_email(), "password": "secret"},
+    })
+    assert response.status == 200
+    async with async_session() as session:
+        names = (await session.exec(select(Account.account_organisation).order_by(Account.id))).all()
+    assert names == ["Concurrent", "New"]
+
+
+async def test_create_account_links_an_existing_user(api):
+    email = unique_email("second")
+    await api.request("POST", "/accounts/", {
+        "account": {"account_organisation": "First"},
+        "user": {"email": email, "password": "secret"},
+    })
+    response = await api.request("POST", "/accounts/", {
+        "account": {"account_organisation": "Second"},
+        "user": {"email": email, "password": "ignored"},
+    })
+    assert response.status == 200
+    assert (await api.login(email, "secret")).status == 200
+    accounts = (await api.request("GET", "/accounts/")).json()
+    assert [account["account_organisation"] for account in accounts] == ["First", "Second"]
+
+
+async def _delete_elsewhere(account_id: int):
+    # Another worker's delete: this worker's account cache is never told
+    async with async_session() as other:
+        await other.exec(delete(UserAccountLink).where(UserAccountLink.account_id == account_id))
+        await other.exec(delete(Account).where(Account.id == account_id))
+        await other.commit()
+
+
+async def test_write_routes_do_not_trust_a_stale_account_cache(api, owner_account):
+    unique_id = owner_account["account_unique_id"]
+    assert (await api.request("GET", f"/accounts/{unique_id}")).status == 200
+    assert await account_cache.get(unique_id) is not None
+    await _delete_elsewhere(owner_account["id"])
+
+    bulk = await api.request("POST", f"/users/bulk/{unique_id}", [{"email": unique_email(), "password": "x"}])
+    assert bulk.status == 404
+    assert (await api.request("DELETE", f"/accounts/{unique_id}")).status == 404
+
+
+async def test_rename_keeps_cached_principals_and_delete_drops_members_only(api, owner_account):
+    assert (await api.request("GET", "/accounts/")).status == 200
+    assert principal_cache.get(api.email) is not None
+
+    renamed = await api.request("PUT", f"/accounts/{owner_account['account_unique_id']}",
+                                {"account_organisation": "Renamed"})
+    assert renamed.status == 200
+    assert principal_cache.get(api.email) is not None
+
+    outsider = unique_email("outsider")
+    await api.request("POST", "/accounts/", {
+        "account": {"account_organisation": "Other"},
+        "user": {"email": outsider, "password": "secret"},
+    })
+    await api.login(outsider, "secret")
+    assert (await api.request("GET", "/accounts/")).status == 200
+    assert principal_cache.get(outsider) is not None
+
+    deleted = await api.request("DELETE", f"/accounts/{owner_account['account_unique_id']}")
+    assert deleted.status == 200
+    assert principal_cache.get(outsider) is not None
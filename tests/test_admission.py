@@ -0,0 +1,106 @@
+import anyio
+import pytest
+from app.core.admission import AdmissionGroup, AdmissionMiddleware, AdmissionRejected
+from benchmarks import asgi_client
+
+pytestmark = pytest.mark.anyio
+
+
+def _group(**overrides) -> AdmissionGroup:
+    options = dict(
+        name="test", min_limit=1, max_limit=2, target_latency_ms=50,
+        queue_size=1, queue_timeout_seconds=0.2,
+    )
+    return AdmissionGroup(**{**options, **overrides})
+
+
+async def test_requests_over_the_limit_queue_then_get_the_freed_slot():
+    group = _group()
+    await group.acquire()
+    await group.acquire()
+    admitted = []
+
+    async def waiter():
+        await group.acquire()
+        admitted.append(True)
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(waiter)
+        await anyio.sleep(0.01)
+        assert group.stats()["queued"] == 1
+        assert not admitted
+        group.release(None)
+    assert admitted
+    assert group.in_flight == 2
+
+
+async def test_rejects_when_queue_is_full_or_wait_times_out():
+    group = _group()
+    await group.acquire()
+    await group.acquire()
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(group.acquire)
+        await anyio.sleep(0.01)
+        with pytest.raises(AdmissionRejected):
+            await group.acquire()
+        group.release(None)
+
+    with pytest.raises(AdmissionRejected):
+        await group.acquire()
+    assert group.stats() == {"limit": 2, "in_flight": 2, "queued": 0, "rejected": 2}
+
+
+async def test_limit_backs_off_on_slow_requests_and_recovers_on_fast_ones():
+    group = _group(max_limit=10, min_limit=2, backoff=0.5)
+    await group.acquire()
+    group.release(1.0)
+    assert group.limit == 5
+    # A burst of slow requests within one target latency counts once
+    await group.acquire()
+    group.release(1.0)
+    assert group.limit == 5
+
+    for _ in range(20):
+        await group.acquire()
+        group.release(0.001)
+    assert group.limit > 5
+
+
+def _app(delay_before_start: float = 0, delay_after_start: float = 0):
+    async def app(scope, receive, send):
+        await anyio.sleep(delay_before_start)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await anyio.sleep(delay_after_start)
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+
+async def test_middleware_samples_latency_until_response_start():
+    group = _group(max_limit=4, target_latency_ms=20)
+    middleware = AdmissionMiddleware(
+        _app(delay_after_start=0.05), groups={"reads": group, "writes": group}, prefix="/api"
+    )
+    assert (await asgi_client.get(middleware, "/api/stream"))[0] == 200
+    assert group.limit == 4
+    assert group.in_flight == 0
+
+    slow = AdmissionMiddleware(_app(delay_before_start=0.05), groups={"writes": group}, prefix="/api")
+    assert (await asgi_client.request(slow, "POST", "/api/things"))[0] == 200
+    assert group.limit < 4
+
+
+async def test_middleware_skips_samples_for_unsampled_paths_and_outside_prefix():
+    group = _group(max_limit=4, target_latency_ms=20, queue_size=0)
+    middleware = AdmissionMiddleware(
+        _app(delay_before_start=0.05), groups={"writes": group}, prefix="/api", unsampled_paths=("/bulk/",)
+    )
+    assert (await asgi_client.request(middleware, "POST", "/api/bulk/"))[0] == 200
+    assert group.limit == 4
+
+    for _ in range(4):
+        await group.acquire()
+    assert (await asgi_client.request(middleware, "POST", "/health"))[0] == 200
+    status, headers, _ = await asgi_client.request(middleware, "POST", "/api/things")
+    assert status == 503
+    assert headers["retry-after"] == "1"
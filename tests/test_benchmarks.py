@@ -0,0 +1,20 @@
+"""
+Runs the budget checks from benchmarks/ as part of the test suite.
+"""
+from pathlib import Path
+from benchmarks import check_query_plans, check_statement_counts, startup
+
+
+def test_write_routes_stay_within_statement_budgets(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    assert check_statement_counts.main() == 0
+
+
+def test_hot_lookups_use_indexes():
+    assert check_query_plans.main() == 0
+
+
+def test_startup_within_budget_and_defers_heavy_imports(monkeypatch):
+    # The child interpreters import app from their working directory
+    monkeypatch.chdir(Path(__file__).resolve().parent.parent)
+    assert startup.main(["--runs", "3"]) == 0
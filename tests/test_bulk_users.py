@@ -0,0 +1,75 @@
+import pytest
+from app.core.db import async_session
+from app.models.associations import UserAccountLink
+from app.models.users import User
+from app.schemas.users import UserBulkItem
+from app.utils import users as user_utils
+from tests.helpers import encode_multipart
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_report_has_a_result_per_row(api, session, owner_account):
+    existing = User(email="existing@example.com", password="not-a-hash")
+    session.add(existing)
+    await session.commit()
+
+    response = await api.request("POST", f"/users/bulk/{owner_account['account_unique_id']}", [
+        {"email": "new@example.com", "password": "secret"},
+        {"email": "existing@example.com"},
+        {"email": "new@example.com", "password": "secret"},
+        {"email": "nopassword@example.com"},
+        {"email": ""},
+    ])
+    assert response.status == 200
+    report = response.json()
+    assert [(result["row"], result["status"]) for result in report["results"]] == [
+        (0, "created"), (1, "linked"), (2, "failed"), (3, "failed"), (4, "failed"),
+    ]
+    assert report["results"][1]["user_id"] == existing.id
+    assert (report["created"], report["linked"], report["unchanged"], report["failed"]) == (1, 1, 0, 3)
+
+    again = await api.request("POST", f"/users/bulk/{owner_account['account_unique_id']}", [
+        {"email": "existing@example.com"},
+    ])
+    assert again.json()["results"][0]["status"] == "unchanged"
+
+
+async def test_csv_upload(api, owner_account):
+    body, content_type = encode_multipart({}, {
+        "file": ("users.csv", b"\xef\xbb\xbfemail,password,full_name\ncsv@example.com,secret,From CSV\n"),
+    })
+    response = await api.request("POST", f"/users/bulk/{owner_account['account_unique_id']}/csv",
+                                 body=body, content_type=content_type)
+    assert response.status == 200
+    assert response.json()["results"][0]["status"] == "created"
+
+
+async def test_csv_that_is_not_utf8_is_rejected(api, owner_account):
+    body, content_type = encode_multipart({}, {"file": ("users.csv", b"\xff\xfeemail\n")})
+    response = await api.request("POST", f"/users/bulk/{owner_account['account_unique_id']}/csv",
+                                 body=body, content_type=content_type)
+    assert response.status == 400
+
+
+async def test_link_created_concurrently_does_not_fail_the_batch(session, owner_account, monkeypatch):
+    existing = User(email="racer@example.com", password="not-a-hash")
+    session.add(existing)
+    await session.commit()
+    hash_passwords = user_utils.hash_passwords
+
+    async def hash_while_another_request_links(passwords):
+        # Runs between the membership lookup and the link insert
+        async with async_session() as other:
+            other.add(UserAccountLink(user_id=existing.id, account_id=owner_account["id"]))
+            await other.commit()
+        return await hash_passwords(passwords)
+
+    monkeypatch.setattr(user_utils, "hash_passwords", hash_while_another_request_links)
+    report = await user_utils.bulk_create_users_for_account(
+        account_id=owner_account["id"],
+        items=[UserBulkItem(email="racer@example.com"), UserBulkItem(email="fresh@example.com", password="secret")],
+        session=session,
+    )
+    await session.commit()
+    assert [result.status for result in report.results] == ["linked", "created"]
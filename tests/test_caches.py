@@ -0,0 +1,90 @@
+import time
+import pytest
+from app.core.account_cache import AccountCache, CachedAccount
+from app.core.cache import TTLCache
+from app.core.principal_cache import PrincipalCache
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats() == {"entries": 2, "hits": 3, "misses": 1}
+
+
+def test_ttl_cache_expires_entries():
+    cache = TTLCache(max_entries=10, ttl_seconds=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_principal_cache_ignores_loads_that_raced_an_invalidation():
+    cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+    version = cache.version("a@example.com")
+    cache.invalidate("a@example.com")
+    cache.set("a@example.com", "stale", version)
+    assert cache.get("a@example.com") is None
+
+    cache.set("a@example.com", "fresh", cache.version("a@example.com"))
+    assert cache.get("a@example.com") == "fresh"
+
+
+def test_principal_cache_clear_drops_every_subject():
+    cache = PrincipalCache(max_entries=10, ttl_seconds=60)
+    version = cache.version("a@example.com")
+    cache.set("a@example.com", "principal", version)
+    cache.clear()
+    assert cache.get("a@example.com") is None
+    cache.set("a@example.com", "stale", version)
+    assert cache.get("a@example.com") is None
+
+
+class _DictBackend:
+    def __init__(self):
+        self.entries = {}
+
+    async def get(self, account_unique_id):
+        return self.entries.get(account_unique_id)
+
+    async def set(self, account_unique_id, account):
+        self.entries[account_unique_id] = account
+
+    async def delete(self, account_unique_id):
+        self.entries.pop(account_unique_id, None)
+
+
+ACCOUNT = CachedAccount(id=1, account_organisation="Org", account_unique_id="abc", version=0)
+
+
+@pytest.mark.anyio
+async def test_account_cache_skips_rows_read_before_an_invalidation():
+    cache = AccountCache(max_entries=10, ttl_seconds=60)
+    version = cache.version("abc")
+    cache.invalidate("abc")
+    await cache.set("abc", ACCOUNT, version)
+    assert await cache.get("abc") is None
+
+    await cache.set("abc", ACCOUNT, cache.version("abc"))
+    assert await cache.get("abc") == ACCOUNT
+
+
+@pytest.mark.anyio
+async def test_account_cache_shares_entries_and_invalidations_through_backend():
+    backend = _DictBackend()
+    writer = AccountCache(max_entries=10, ttl_seconds=60, backend=backend)
+    reader = AccountCache(max_entries=10, ttl_seconds=60, backend=backend)
+
+    await writer.set("abc", ACCOUNT, writer.version("abc"))
+    assert await reader.get("abc") == ACCOUNT
+
+    writer.invalidate("abc")
+    for task in list(writer._pending):
+        await task
+    assert backend.entries == {}
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import select
+from app.core.email_outbox import (
+    FAILED, PENDING, SENDING, SENT, EmailDispatcher, FakeSESTransport, enqueue_email,
+)
+from app.models.email import EmailOutbox
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def transport() -> FakeSESTransport:
+    return FakeSESTransport()
+
+
+@pytest.fixture
+def dispatcher(transport) -> EmailDispatcher:
+    dispatcher = EmailDispatcher(transport=transport)
+    dispatcher.max_attempts = 2
+    return dispatcher
+
+
+async def _enqueue(session) -> int:
+    message = await enqueue_email("to@example.com", "Subject", "Text", "<p>Html</p>", session)
+    return message.id
+
+
+async def _message(session, message_id: int) -> EmailOutbox:
+    session.expire_all()
+    return (await session.exec(select(EmailOutbox).where(EmailOutbox.id == message_id))).one()
+
+
+async def _make_due(session, message_id: int):
+    message = await _message(session, message_id)
+    message.next_attempt_at = datetime.now() - timedelta(seconds=1)
+    await session.commit()
+
+
+async def test_dispatch_sends_and_marks_sent(session, dispatcher, transport):
+    message_id = await _enqueue(session)
+    assert await dispatcher.dispatch_pending() is False
+
+    message = await _message(session, message_id)
+    assert message.status == SENT
+    assert message.attempts == 1
+    assert message.provider_message_id == transport.sent[0]["message_id"]
+    assert transport.sent[0]["to_email"] == "to@example.com"
+
+    await dispatcher.dispatch_pending()
+    assert len(transport.sent) == 1
+
+
+async def test_failed_send_backs_off_then_retries(session, dispatcher, transport):
+    message_id = await _enqueue(session)
+    transport.fail_next = 1
+    before = datetime.now()
+    await dispatcher.dispatch_pending()
+
+    message = await _message(session, message_id)
+    assert message.status == PENDING
+    assert message.attempts == 1
+    assert "Simulated SES failure" in message.last_error
+    assert message.next_attempt_at >= before + timedelta(seconds=dispatcher.backoff_seconds)
+
+    # Not due yet
+    await dispatcher.dispatch_pending()
+    assert transport.sent == []
+
+    await _make_due(session, message_id)
+    await dispatcher.dispatch_pending()
+    message = await _message(session, message_id)
+    assert (message.status, message.attempts) == (SENT, 2)
+    assert len(transport.sent) == 1
+
+
+async def test_gives_up_after_max_attempts(session, dispatcher, transport):
+    message_id = await _enqueue(session)
+    transport.fail_next = 2
+    await dispatcher.dispatch_pending()
+    await _make_due(session, message_id)
+    await dispatcher.dispatch_pending()
+
+    message = await _message(session, message_id)
+    assert (message.status, message.attempts) == (FAILED, 2)
+    await _make_due(session, message_id)
+    await dispatcher.dispatch_pending()
+    assert transport.sent == []
+
+
+async def test_expired_lease_is_claimed_again(session, dispatcher, transport):
+    message_id = await _enqueue(session)
+    claimed = await dispatcher._claim_batch()
+    assert [message.id for message in claimed] == [message_id]
+    assert (await _message(session, message_id)).status == SENDING
+
+    # Leased messages are skipped until the lease runs out
+    await dispatcher.dispatch_pending()
+    assert transport.sent == []
+
+    await _make_due(session, message_id)
+    await dispatcher.dispatch_pending()
+    assert (await _message(session, message_id)).status == SENT
+
+
+def test_backoff_doubles_per_attempt(dispatcher):
+    assert dispatcher._backoff(2) == 2 * dispatcher._backoff(1)
+    assert dispatcher._backoff(30) == timedelta(hours=1)
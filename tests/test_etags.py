@@ -0,0 +1,51 @@
+import pytest
+from tests.helpers import unique_email
+
+pytestmark = pytest.mark.anyio
+
+
+async def _assert_revalidates(api, path: str) -> str:
+    first = await api.request("GET", path)
+    assert first.status == 200
+    etag = first.headers["etag"]
+
+    cached = await api.request("GET", path, headers={"if-none-match": etag})
+    assert cached.status == 304
+    assert cached.body == b""
+    assert cached.headers["etag"] == etag
+    assert (await api.request("GET", path, headers={"if-none-match": f'"other", W/{etag}'})).status == 304
+    return etag
+
+
+async def _assert_changed(api, path: str, etag: str):
+    response = await api.request("GET", path, headers={"if-none-match": etag})
+    assert response.status == 200
+    assert response.headers["etag"] != etag
+    assert (await api.request("GET", path, headers={"if-none-match": response.headers["etag"]})).status == 304
+
+
+@pytest.mark.parametrize("path", ["/accounts/", "/accounts/{unique_id}"])
+async def test_account_reads_revalidate_until_the_account_changes(api, owner_account, path):
+    unique_id = owner_account["account_unique_id"]
+    path = path.format(unique_id=unique_id)
+    etag = await _assert_revalidates(api, path)
+
+    renamed = await api.request("PUT", f"/accounts/{unique_id}", {"account_organisation": "Renamed"})
+    assert renamed.status == 200
+    await _assert_changed(api, path, etag)
+
+
+async def test_account_users_revalidate_until_a_member_changes(api, owner_account):
+    path = f"/users/{owner_account['account_unique_id']}"
+    etag = await _assert_revalidates(api, path)
+
+    owner_id = (await api.request("GET", path)).json()[0]["id"]
+    updated = await api.request("PUT", f"/users/{owner_id}", {"full_name": "Renamed Owner"})
+    assert updated.status == 200
+    await _assert_changed(api, path, etag)
+
+    etag = (await api.request("GET", path)).headers["etag"]
+    added = await api.request("POST", f"/users/bulk/{owner_account['account_unique_id']}",
+                              [{"email": unique_email("member"), "password": "x"}])
+    assert added.status == 200
+    await _assert_changed(api, path, etag)
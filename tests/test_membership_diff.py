@@ -0,0 +1,82 @@
+import pytest
+from sqlmodel import select
+from app.core.config import settings
+from app.models.accounts import Account
+from app.models.associations import UserAccountLink
+from app.models.users import User
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def accounts(session) -> tuple[int, int]:
+    first = Account(account_organisation="First", account_unique_id="first")
+    second = Account(account_organisation="Second", account_unique_id="second")
+    session.add_all([first, second])
+    await session.commit()
+    return first.id, second.id
+
+
+@pytest.fixture
+async def user_ids(session, accounts) -> list[int]:
+    first, second = accounts
+    users = [User(email=f"diff{i}@example.com", password="not-a-hash") for i in range(3)]
+    session.add_all(users)
+    await session.flush()
+    session.add_all(UserAccountLink(user_id=user.id, account_id=first) for user in users)
+    session.add(UserAccountLink(user_id=users[0].id, account_id=second))
+    await session.commit()
+    return [user.id for user in users]
+
+
+async def _links(session) -> set[tuple[int, int]]:
+    result = await session.exec(select(UserAccountLink.user_id, UserAccountLink.account_id))
+    return set(result.all())
+
+
+async def _versions(session, user_ids: list[int]) -> list[tuple[int, int]]:
+    session.expire_all()
+    result = await session.exec(select(User.token_version, User.version).where(User.id.in_(user_ids)).order_by(User.id))
+    return result.all()
+
+
+async def test_diff_skips_existing_links_and_unknown_ids(api, session, owner_account, accounts, user_ids):
+    first, second = accounts
+    response = await api.request("PATCH", "/users/memberships/", {
+        "user_ids": [*user_ids, 999999],
+        "add_account_ids": [second, 999999],
+        "remove_account_ids": [first],
+    })
+    assert response.status == 200
+    # The first user's existing link to the second account is left alone
+    assert response.json() == {"memberships_added": 2, "memberships_removed": 3, "users_changed": 3}
+    assert await _links(session) >= {(user_id, second) for user_id in user_ids}
+    assert not {(user_id, first) for user_id in user_ids} & await _links(session)
+    assert await _versions(session, user_ids) == [(1, 1)] * 3
+
+
+async def test_diff_that_changes_nothing_keeps_versions(api, session, owner_account, accounts, user_ids):
+    first, _ = accounts
+    response = await api.request("PATCH", "/users/memberships/", {
+        "user_ids": user_ids,
+        "add_account_ids": [first],
+    })
+    assert response.json() == {"memberships_added": 0, "memberships_removed": 0, "users_changed": 0}
+    assert await _versions(session, user_ids) == [(0, 0)] * 3
+
+
+async def test_diff_rejects_overlapping_and_oversized_requests(api, owner_account, accounts, user_ids, monkeypatch):
+    first, second = accounts
+    overlapping = await api.request("PATCH", "/users/memberships/", {
+        "user_ids": user_ids,
+        "add_account_ids": [first, second],
+        "remove_account_ids": [second],
+    })
+    assert overlapping.status == 400
+
+    monkeypatch.setattr(settings, "BULK_USERS_MAX_ROWS", 2)
+    oversized = await api.request("PATCH", "/users/memberships/", {
+        "user_ids": user_ids,
+        "add_account_ids": [second],
+    })
+    assert oversized.status == 413
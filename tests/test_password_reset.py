@@ -0,0 +1,66 @@
+import re
+import anyio
+import pytest
+from sqlmodel import select
+from app.core.config import settings
+from app.models.email import EmailOutbox
+from tests.helpers import ApiClient, unique_email
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture(autouse=True)
+def signed_reset_tokens(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_RESET_TOKEN_MODE", "signed")
+
+
+async def _reset_token(api, session, email: str) -> str:
+    response = await api.request("POST", "/auth/forgot-password", json_body={"email": email})
+    assert response.status == 200
+    result = await session.exec(select(EmailOutbox.text_body).where(EmailOutbox.to_email == email))
+    return re.search(r"token=([\w.\-]+)", result.one()).group(1)
+
+
+async def test_signed_reset_round_trip(api, session, owner_account):
+    email = api.email
+    token = await _reset_token(api, session, email)
+    assert (await api.request("POST", "/auth/validate-token", json_body={"token": token})).status == 200
+
+    reset = {"token": token, "new_password": "new-password"}
+    assert (await api.request("POST", "/auth/reset-password", json_body=reset)).status == 200
+    assert (await api.login(email, "owner-password")).status == 401
+    assert (await api.login(email, "new-password")).status == 200
+
+    # The new password no longer matches the token's fingerprint
+    reset = {"token": token, "new_password": "another-password"}
+    assert (await api.request("POST", "/auth/reset-password", json_body=reset)).status == 400
+    assert (await api.login(email, "new-password")).status == 200
+
+
+async def test_concurrent_resets_with_one_token_apply_once(api, session, owner_account):
+    email = api.email
+    token = await _reset_token(api, session, email)
+    statuses = {}
+
+    async def reset(password: str):
+        response = await ApiClient().request(
+            "POST", "/auth/reset-password", json_body={"token": token, "new_password": password},
+        )
+        statuses[password] = response.status
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(reset, "first-password")
+        tg.start_soon(reset, "second-password")
+
+    assert sorted(statuses.values()) == [200, 400]
+    winner = next(password for password, status in statuses.items() if status == 200)
+    loser = next(password for password, status in statuses.items() if status == 400)
+    assert (await api.login(email, loser)).status == 401
+    assert (await api.login(email, winner)).status == 200
+
+
+async def test_reset_with_a_tampered_token_is_rejected(api):
+    email = unique_email("unknown")
+    reset = {"token": "not-a-token", "new_password": "new-password"}
+    assert (await api.request("POST", "/auth/reset-password", json_body=reset)).status == 400
+    assert (await api.login(email, "new-password")).status == 401
@@ -0,0 +1,136 @@
+import json
+import anyio
+import pytest
+from app.core.rate_limit import InMemoryRateLimitBackend, RateLimitMiddleware, RateLimitRule
+from app.core.config import settings
+from benchmarks import asgi_client
+from tests.helpers import encode_multipart, unique_email
+
+pytestmark = pytest.mark.anyio
+
+
+async def _echo_app(scope, receive, send):
+    message = await receive()
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": message.get("body", b"")})
+
+
+def _login(app, email: str):
+    return asgi_client.request(
+        app, "POST", "/login",
+        headers={"content-type": "application/json"},
+        body=json.dumps({"email": email}).encode(),
+    )
+
+
+def _email_limited_app(limit: int = 2):
+    rules = [RateLimitRule(method="POST", path="/login", limit=limit, window_seconds=60, key="email")]
+    return RateLimitMiddleware(_echo_app, rules=rules, backend=InMemoryRateLimitBackend(max_keys=10))
+
+
+async def test_bucket_allows_limit_then_refills():
+    backend = InMemoryRateLimitBackend(max_keys=10)
+    rule = RateLimitRule(method="POST", path="/login", limit=2, window_seconds=0.2)
+    assert await backend.take(rule, "k") == 0
+    assert await backend.take(rule, "k") == 0
+    retry_after = await backend.take(rule, "k")
+    assert 0 < retry_after <= 0.1
+    assert await backend.take(rule, "other") == 0
+
+    await anyio.sleep(0.15)
+    assert await backend.take(rule, "k") == 0
+
+
+async def test_middleware_limits_per_email_and_replays_body():
+    rules = [
+        RateLimitRule(method="POST", path="/login", limit=10, window_seconds=60),
+        RateLimitRule(method="POST", path="/login", limit=2, window_seconds=60, key="email"),
+    ]
+    app = RateLimitMiddleware(_echo_app, rules=rules, backend=InMemoryRateLimitBackend(max_keys=10))
+
+    status, _, body = await _login(app, "A@example.com")
+    assert status == 200
+    assert json.loads(body) == {"email": "A@example.com"}
+    assert (await _login(app, "a@example.com"))[0] == 200
+
+    status, headers, _ = await _login(app, "a@example.com")
+    assert status == 429
+    assert int(headers["retry-after"]) >= 1
+    assert (await _login(app, "b@example.com"))[0] == 200
+
+
+async def test_middleware_limits_per_ip_and_ignores_other_routes():
+    rules = [RateLimitRule(method="POST", path="/login", limit=1, window_seconds=60)]
+    app = RateLimitMiddleware(_echo_app, rules=rules, backend=InMemoryRateLimitBackend(max_keys=10))
+
+    assert (await _login(app, "a@example.com"))[0] == 200
+    assert (await _login(app, "b@example.com"))[0] == 429
+    assert (await asgi_client.get(app, "/login"))[0] == 200
+
+
+async def test_middleware_limits_multipart_and_repeated_form_fields():
+    app = _email_limited_app()
+    for _ in range(2):
+        body, content_type = encode_multipart({"email": "a@example.com"})
+        status, _, echoed = await asgi_client.request(
+            app, "POST", "/login", headers={"content-type": content_type}, body=body,
+        )
+        assert status == 200
+        assert echoed == body
+
+    body, content_type = encode_multipart({"email": "A@example.com"})
+    assert (await asgi_client.request(app, "POST", "/login", headers={"content-type": content_type}, body=body))[0] == 429
+    # The route reads the last of repeated fields, so the limiter must too
+    status, _, _ = await asgi_client.request(
+        app, "POST", "/login",
+        headers={"content-type": "application/x-www-form-urlencoded"},
+        body=b"email=other%40example.com&email=a%40example.com",
+    )
+    assert status == 429
+
+
+async def test_middleware_rejects_bodies_it_cannot_key():
+    app = _email_limited_app()
+    malformed = [
+        ({"content-type": "application/json"}, b"{not json"),
+        ({"content-type": "application/json"}, b'["a@example.com"]'),
+        ({"content-type": "text/plain"}, b"a@example.com"),
+        ({"content-type": "multipart/form-data; boundary=xyz"}, b"a@example.com"),
+    ]
+    for headers, body in malformed:
+        assert (await asgi_client.request(app, "POST", "/login", headers=headers, body=body))[0] == 400
+
+    too_large = json.dumps({"email": "a@example.com", "padding": "x" * 65536}).encode()
+    status, _, _ = await asgi_client.request(
+        app, "POST", "/login", headers={"content-type": "application/json"}, body=too_large,
+    )
+    assert status == 413
+
+
+async def test_middleware_stops_reading_a_body_without_content_length_at_the_cap():
+    app = _email_limited_app()
+    chunks_read = 0
+
+    async def receive():
+        nonlocal chunks_read
+        chunks_read += 1
+        return {"type": "http.request", "body": b"x" * 16384, "more_body": True}
+
+    response = {}
+
+    async def send(message):
+        response.setdefault("status", message.get("status"))
+
+    scope = {"type": "http", "method": "POST", "path": "/login", "headers": [(b"content-type", b"application/json")]}
+    await app(scope, receive, send)
+    assert response["status"] == 413
+    assert chunks_read == 5
+
+
+async def test_login_limits_multipart_logins_per_email(api):
+    email = unique_email("limited")
+    statuses = []
+    for _ in range(settings.LOGIN_RATE_LIMIT_PER_EMAIL + 1):
+        body, content_type = encode_multipart({"username": email, "password": "wrong-password"})
+        statuses.append((await api.request("POST", "/auth/login", body=body, content_type=content_type)).status)
+    assert statuses == [401] * settings.LOGIN_RATE_LIMIT_PER_EMAIL + [429]
@@ -0,0 +1,69 @@
+from datetime import datetime, timedelta
+import anyio
+import pytest
+from sqlmodel import select
+from app.core.db import async_session
+from app.core.security import create_refresh_token, get_refresh_token, rotate_refresh_token
+from app.models.security import RefreshToken
+from app.models.users import User
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def user_id(session) -> int:
+    user = User(email="refresh@example.com", password="not-a-hash")
+    session.add(user)
+    await session.commit()
+    return user.id
+
+
+async def _rotate(token: str):
+    async with async_session() as session:
+        return await rotate_refresh_token(token, session)
+
+
+async def test_rotation_issues_a_new_token_in_the_same_family(session, user_id):
+    token = await create_refresh_token(user_id, session)
+    rotated_user_id, new_token = await _rotate(token)
+    assert rotated_user_id == user_id
+    assert new_token != token
+
+    old, new = await get_refresh_token(token, session), await get_refresh_token(new_token, session)
+    assert old.revoked_at is not None
+    assert new.revoked_at is None
+    assert new.family_id == old.family_id
+
+
+async def test_reusing_a_rotated_token_revokes_the_family(session, user_id):
+    token = await create_refresh_token(user_id, session)
+    _, new_token = await _rotate(token)
+
+    assert await _rotate(token) is None
+    assert await _rotate(new_token) is None
+
+
+async def test_expired_token_is_rejected(session, user_id):
+    token = await create_refresh_token(user_id, session)
+    record = await get_refresh_token(token, session)
+    record.expires_at = datetime.now() - timedelta(seconds=1)
+    await session.commit()
+    assert await _rotate(token) is None
+
+
+async def test_concurrent_refreshes_with_one_token_succeed_once(session, user_id):
+    token = await create_refresh_token(user_id, session)
+    results = []
+
+    async def refresh():
+        results.append(await _rotate(token))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(refresh)
+
+    winners = [result for result in results if result is not None]
+    assert len(winners) == 1
+    # The losers look like reuse of a rotated token, so the family is revoked
+    live = (await session.exec(select(RefreshToken).where(RefreshToken.revoked_at.is_(None)))).all()
+    assert live == []
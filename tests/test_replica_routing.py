@@ -0,0 +1,73 @@
+import pytest
+from sqlmodel import SQLModel, select
+from app.core import db
+from app.models.accounts import Account
+
+pytestmark = pytest.mark.anyio
+
+
+async def _seed(engine, organisation: str):
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.execute(Account.__table__.insert().values(
+            account_organisation=organisation, account_unique_id="seeded", version=0,
+        ))
+
+
+@pytest.fixture
+async def replicas(session, tmp_path, monkeypatch):
+    """
+    Two SQLite replica files whose only account names the file it lives in.
+    """
+    engines = [
+        db.create_engine_from_settings(f"sqlite+aiosqlite:///{tmp_path / name}.db")
+        for name in ("replica-1", "replica-2")
+    ]
+    for engine, name in zip(engines, ("replica-1", "replica-2")):
+        await _seed(engine, name)
+    session.add(Account(account_organisation="primary", account_unique_id="seeded"))
+    await session.commit()
+
+    replica_set = db.ReplicaSet(engines)
+    monkeypatch.setattr(db, "replica_set", replica_set)
+    yield replica_set
+    for engine in engines:
+        await engine.dispose()
+
+
+async def _read_organisation(session) -> str:
+    return (await session.exec(select(Account.account_organisation))).one()
+
+
+async def test_session_keeps_one_replica_and_sessions_rotate(replicas):
+    seen = []
+    for _ in range(2):
+        async with db.async_read_session() as session:
+            reads = {await _read_organisation(session) for _ in range(3)}
+            assert len(reads) == 1
+            seen += reads
+    assert sorted(seen) == ["replica-1", "replica-2"]
+
+
+async def test_session_reads_its_writes_from_the_primary_after_a_flush(replicas):
+    async with db.async_read_session() as session:
+        assert (await _read_organisation(session)).startswith("replica")
+        session.add(Account(account_organisation="written", account_unique_id="written"))
+        await session.flush()
+        rows = (await session.exec(select(Account.account_organisation).order_by(Account.id))).all()
+        assert rows == ["primary", "written"]
+
+
+async def test_failed_replica_read_is_retried_on_the_primary(session, tmp_path, monkeypatch):
+    broken = db.create_engine_from_settings(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replica_set = db.ReplicaSet([broken])
+    monkeypatch.setattr(db, "replica_set", replica_set)
+    session.add(Account(account_organisation="primary", account_unique_id="seeded"))
+    await session.commit()
+
+    async with db.async_read_session() as read_session:
+        assert await _read_organisation(read_session) == "primary"
+        assert await _read_organisation(read_session) == "primary"
+    assert replica_set.status()[0]["healthy"] is False
+    assert replica_set.pick() is None
+    await broken.dispose()
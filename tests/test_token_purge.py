@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlmodel import select
+from app.core.email_outbox import FAILED, PENDING, SENT
+from app.core.token_purge import TokenPurger
+from app.models.email import EmailOutbox
+from app.models.security import PasswordResetToken, RefreshToken, RevokedAccessToken
+from app.models.users import User
+
+pytestmark = pytest.mark.anyio
+
+
+def _email(status: str, age: timedelta) -> EmailOutbox:
+    return EmailOutbox(
+        to_email="purge@example.com", subject="Reset", text_body="link", html_body="link",
+        status=status, created_at=datetime.now() - age,
+    )
+
+
+async def test_purge_deletes_expired_rows_in_batches_and_keeps_live_ones(session):
+    user = User(email="purge@example.com", password="not-a-hash")
+    session.add(user)
+    await session.commit()
+
+    past, future = datetime.now() - timedelta(minutes=1), datetime.now() + timedelta(hours=1)
+    session.add_all([
+        *(PasswordResetToken(user_id=user.id, token=f"expired-{i}", expires_at=past) for i in range(3)),
+        PasswordResetToken(user_id=user.id, token="live", expires_at=future),
+        RefreshToken(user_id=user.id, token_hash="expired", family_id="f", expires_at=past),
+        RefreshToken(user_id=user.id, token_hash="live", family_id="f", expires_at=future),
+        RevokedAccessToken(jti="expired", expires_at=past),
+        RevokedAccessToken(jti="live", expires_at=future),
+        _email(SENT, timedelta(days=2)),
+        _email(FAILED, timedelta(days=2)),
+        _email(SENT, timedelta(minutes=5)),
+        _email(PENDING, timedelta(days=2)),
+    ])
+    await session.commit()
+
+    purger = TokenPurger(batch_size=2, interval_seconds=60, outbox_retention=timedelta(days=1))
+    # Three expired reset tokens fill the first batch of two
+    assert await purger.purge() is True
+    assert await purger.purge() is False
+
+    session.expire_all()
+    assert (await session.exec(select(PasswordResetToken.token))).all() == ["live"]
+    assert (await session.exec(select(RefreshToken.token_hash))).all() == ["live"]
+    assert (await session.exec(select(RevokedAccessToken.jti))).all() == ["live"]
+    remaining = (await session.exec(select(EmailOutbox).order_by(EmailOutbox.id))).all()
+    assert [(email.status, email.created_at > datetime.now() - timedelta(days=1)) for email in remaining] == [
+        (SENT, True),
+        (PENDING, False),
+    ]
@@ -0,0 +1,57 @@
+import time
+import pytest
+from app.core.tokens import TokenError, decode_token, encode_token, sign_payload, verify_signed_payload
+
+
+def _tamper(token: str) -> str:
+    head, _, signature = token.rpartition(".")
+    return f"{head}.{'A' if signature[0] != 'A' else 'B'}{signature[1:]}"
+
+
+def test_encoded_token_round_trips():
+    claims = {"sub": "someone@example.com", "exp": int(time.time()) + 60, "jti": "abc"}
+    assert decode_token(encode_token(claims)) == claims
+
+
+def test_decode_rejects_bad_signature():
+    token = encode_token({"sub": "someone@example.com"})
+    with pytest.raises(TokenError):
+        decode_token(_tamper(token))
+
+
+def test_decode_rejects_expired_token():
+    token = encode_token({"sub": "someone@example.com", "exp": int(time.time()) - 1})
+    with pytest.raises(TokenError, match="expired"):
+        decode_token(token)
+
+
+def test_decode_rejects_other_algorithm():
+    token = encode_token({"sub": "someone@example.com"})
+    _, payload, signature = token.split(".")
+    header = "eyJhbGciOiJub25lIiwidHlwIjoiSldUIn0"  # {"alg":"none","typ":"JWT"}
+    with pytest.raises(TokenError):
+        decode_token(f"{header}.{payload}.{signature}")
+
+
+@pytest.mark.parametrize("token", ["", "not-a-token", "a.b.c", "...."])
+def test_decode_rejects_malformed_tokens(token):
+    with pytest.raises(TokenError):
+        decode_token(token)
+
+
+def test_signed_payload_round_trips():
+    claims = {"uid": 1, "exp": int(time.time()) + 60}
+    assert verify_signed_payload(sign_payload(claims, "reset"), "reset") == claims
+
+
+def test_signed_payload_is_bound_to_its_purpose():
+    token = sign_payload({"uid": 1}, "reset")
+    with pytest.raises(TokenError):
+        verify_signed_payload(token, "refresh")
+
+
+def test_signed_payload_rejects_tampering_and_expiry():
+    with pytest.raises(TokenError):
+        verify_signed_payload(_tamper(sign_payload({"uid": 1}, "reset")), "reset")
+    with pytest.raises(TokenError, match="expired"):
+        verify_signed_payload(sign_payload({"uid": 1, "exp": int(time.time()) - 1}, "reset"), "reset")
@@ -0,0 +1,54 @@
+import json
+import pytest
+from app.core.config import settings
+from app.models.associations import UserAccountLink
+from app.models.users import User
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def members(session, owner_account) -> list[int]:
+    users = [User(email=f"member{i}@example.com", password="not-a-hash") for i in range(5)]
+    session.add_all(users)
+    await session.flush()
+    session.add_all(UserAccountLink(user_id=user.id, account_id=owner_account["id"]) for user in users)
+    await session.commit()
+    return [user.id for user in users]
+
+
+async def test_pages_follow_the_next_cursor(api, owner_account, members):
+    seen = []
+    cursor = None
+    while True:
+        query = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await api.request("GET", f"/users/{owner_account['account_unique_id']}", query=query)
+        assert response.status == 200
+        page = response.json()
+        assert len(page) <= 2
+        seen += [user["id"] for user in page]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+        assert int(cursor) == page[-1]["id"]
+
+    assert seen == sorted(seen)
+    assert len(seen) == len(members) + 1  # plus the owner
+    assert set(members) <= set(seen)
+
+
+async def test_page_size_is_capped(api, owner_account):
+    path = f"/users/{owner_account['account_unique_id']}"
+    too_big = await api.request("GET", path, query={"limit": settings.USERS_PAGE_SIZE_MAX + 1})
+    assert too_big.status == 422
+    assert (await api.request("GET", path, query={"limit": settings.USERS_PAGE_SIZE_MAX})).status == 200
+
+
+async def test_stream_returns_every_member_as_ndjson(api, owner_account, members):
+    response = await api.request("GET", f"/users/{owner_account['account_unique_id']}", query={"stream": "true"})
+    assert response.status == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.body.decode().splitlines()]
+    assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+    assert set(members) <= {row["id"] for row in rows}
+    assert set(rows[0]) == {"id", "email", "full_name"}
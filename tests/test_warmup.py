@@ -0,0 +1,12 @@
+import pytest
+from app.core.account_cache import account_cache
+from app.core.principal_cache import principal_cache
+from app.core.warmup import _run_hot_queries
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_hot_queries_leave_the_cache_stats_alone(session):
+    before = principal_cache.stats(), account_cache.stats()
+    await _run_hot_queries(session)
+    assert (principal_cache.stats(), account_cache.stats()) == before